@@ -0,0 +1,81 @@
+# project_tracker_backend/archive.py
+# Hot/cold archival: tasks "Done" for longer than ARCHIVE_AFTER_DAYS are moved from `tasks`
+# into `archived_tasks` in small batches, so the Kanban, list and stats queries only scan
+# the working set. Reads reach archived rows through include_archived / the archive endpoints.
+import logging
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from . import cache, models
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "true").lower() in ("1", "true", "yes")
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_INTERVAL_SECONDS = int(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+# Columns copied verbatim from tasks into archived_tasks
+ARCHIVED_COLUMNS = [
+    "id", "title", "description", "status", "due_date", "project_id",
+    "assigned_to", "created_by", "created_at", "completed_at",
+]
+
+def archive_batch(db: Session, older_than_days: int = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE):
+    # Moves one batch in a single transaction and returns how many tasks were archived.
+    # Tasks done before completed_at existed fall back to their created_at.
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    completed_at = func.coalesce(models.Task.completed_at, models.Task.created_at)
+    # SQLite reuses the highest rowid once that task has been archived (tasks.id has no
+    # AUTOINCREMENT), so a hot task can share its id with an archived one. Such tasks are left
+    # hot rather than failing the whole batch on the archive's primary key; on Postgres the
+    # sequence never reuses ids and the check finds nothing.
+    already_archived = db.query(models.ArchivedTask.id).filter(models.ArchivedTask.id == models.Task.id).exists()
+    ids = [
+        task_id for (task_id,) in db.query(models.Task.id)
+        .filter(models.Task.status == "Done", completed_at < cutoff, ~already_archived)
+        .order_by(models.Task.id)
+        .limit(batch_size)
+        # Several workers may run the archiver; each claims a disjoint batch (no-op on SQLite)
+        .with_for_update(skip_locked=True)
+    ]
+    if not ids:
+        db.rollback()
+        return 0
+    project_ids = [project_id for (project_id,) in db.query(models.Task.project_id).filter(models.Task.id.in_(ids)).distinct()]
+    columns = [getattr(models.Task, name) for name in ARCHIVED_COLUMNS]
+    db.execute(
+        insert(models.ArchivedTask).from_select(
+            ARCHIVED_COLUMNS + ["archived_at"],
+            select(*columns, func.now()).where(models.Task.id.in_(ids)),
+        )
+    )
+    # Project counters are untouched: they count hot and archived tasks alike
+    db.query(models.Task).filter(models.Task.id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+    # Hot task lists of these projects changed
+    cache.invalidate(f"project:{project_id}" for project_id in project_ids)
+    return len(ids)
+
+def run_archival_pass(older_than_days: int = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE, max_batches: int = None):
+    # Archives batch after batch until nothing is left (or max_batches is reached).
+    # Short transactions keep row locks brief for concurrent Kanban writes.
+    total = 0
+    batches = 0
+    db = SessionLocal()
+    try:
+        while max_batches is None or batches < max_batches:
+            archived = archive_batch(db, older_than_days=older_than_days, batch_size=batch_size)
+            if not archived:
+                break
+            total += archived
+            batches += 1
+    finally:
+        db.close()
+    if total:
+        logger.info("Archived %d completed task(s) in %d batch(es)", total, batches)
+    return total
@@ -8,35 +8,125 @@ from sqlalchemy.orm import Session
 from . import schemas, crud, models
 from .database import get_db
 import os # Make sure this is imported at the top
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 
 # Configuration for JWT
 # Read from environment variable. Provide a fallback for local testing if env var not set.
 SECRET_KEY = os.getenv("SECRET_KEY", "your-fallback-super-secret-key-for-dev")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Access tokens are short-lived and renewed with a refresh token (POST /token/refresh), which
+# keeps the verified-token cache small and bounds how long a cached token stays usable.
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "4096"))
+
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+def _encode_token(data: dict, token_type: str, expires_delta: timedelta):
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    to_encode.update({"exp": datetime.utcnow() + expires_delta, "type": token_type})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def verify_token(token: str, credentials_exception):
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    return _encode_token(data, ACCESS_TOKEN_TYPE, expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
+    return _encode_token(data, REFRESH_TOKEN_TYPE, expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
+
+def create_token_pair(username: str):
+    # Response body for /token and /token/refresh (schemas.Token)
+    return {
+        "access_token": create_access_token({"sub": username}),
+        "refresh_token": create_refresh_token({"sub": username}),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+class TokenCache:
+    # Bounded LRU of already-verified access tokens: token digest -> (exp, username).
+    # Only successful verifications are cached, and an entry is never served past the
+    # token's own `exp`, so a hit is exactly as valid as a fresh jwt.decode.
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str):
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str):
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, token: str, exp: float, username: str):
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (exp, username)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+token_cache = TokenCache()
+
+def _decode_token(token: str, token_type: str, credentials_exception):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = schemas.TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    return token_data
+    username = payload.get("sub")
+    # Tokens issued before refresh tokens existed carry no "type" and are treated as access tokens
+    if username is None or payload.get("type", ACCESS_TOKEN_TYPE) != token_type:
+        raise credentials_exception
+    return username, payload["exp"]
+
+def verify_token(token: str, credentials_exception):
+    username = token_cache.get(token)
+    if username is None:
+        username, exp = _decode_token(token, ACCESS_TOKEN_TYPE, credentials_exception)
+        token_cache.set(token, exp, username)
+    return schemas.TokenData(username=username)
+
+def verify_refresh_token(token: str, credentials_exception):
+    # Not cached: refresh tokens are presented once per access-token lifetime
+    username, _ = _decode_token(token, REFRESH_TOKEN_TYPE, credentials_exception)
+    return schemas.TokenData(username=username)
 
 async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
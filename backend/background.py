@@ -0,0 +1,33 @@
+# project_tracker_backend/background.py
+# Periodic in-process work (archival, history flushes, reminders, job leases). Each loop is
+# an asyncio task started with the app and cancelled on shutdown; the blocking function it
+# runs goes to a thread, so the event loop never waits on the database.
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def _run_forever(fn, interval_seconds: float, initial_delay: float):
+    await asyncio.sleep(initial_delay)
+    while True:
+        try:
+            await asyncio.to_thread(fn)
+        except Exception:
+            logger.exception("Background loop %s failed", fn.__qualname__)
+        await asyncio.sleep(interval_seconds)
+
+def start_background_loop(app, fn, interval_seconds: float, initial_delay: float = None):
+    # Calls fn() every interval_seconds (first after initial_delay, default one interval) for
+    # the lifetime of the app. Errors are logged and the loop carries on.
+    task = None
+
+    @app.on_event("startup")
+    async def start():
+        nonlocal task
+        delay = interval_seconds if initial_delay is None else initial_delay
+        task = asyncio.create_task(_run_forever(fn, interval_seconds, delay))
+
+    @app.on_event("shutdown")
+    async def stop():
+        if task is not None:
+            task.cancel()
@@ -0,0 +1,259 @@
+# project_tracker_backend/cache.py
+# Read-through cache for serialized read payloads (users, projects, project task lists).
+# Entries carry tags such as "projects" or "project:42"; crud invalidates the tags a write
+# affects right after it commits, so only the affected entries are dropped.
+#
+# Backends (CACHE_BACKEND):
+#   memory  - per-process LRU (default). Each uvicorn worker has its own copy; CACHE_TTL_SECONDS
+#             bounds how long another worker's writes can go unseen.
+#   local   - SharedStoreBackend over LocalStore, an in-process stand-in for a shared store (tests).
+#   redis   - SharedStoreBackend over Redis at CACHE_URL, shared by all workers (optional `redis`).
+# Shared stores invalidate by bumping a per-tag version that is part of every entry's key,
+# so no tag -> keys index has to be kept in the store; stale entries simply expire.
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from . import serializers
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "60"))
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "sets": self.sets,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+class MemoryLRUBackend:
+    # Values are stored as-is; callers must treat cached payloads as read-only
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl_seconds: int = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._entries = OrderedDict() # key -> (expires_at, tags, value)
+        self._tag_keys = {} # tag -> set of keys, for exact invalidation
+        self._tag_versions = {}
+        self._lock = threading.Lock()
+
+    def token(self, tags):
+        with self._lock:
+            return tuple(self._tag_versions.get(tag, 0) for tag in tags)
+
+    def get(self, key, tags):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[2]
+
+    def set(self, key, value, tags, token):
+        with self._lock:
+            # A write invalidated these tags while the value was loading: don't store stale data
+            if tuple(self._tag_versions.get(tag, 0) for tag in tags) != token:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, tags, value)
+            for tag in tags:
+                self._tag_keys.setdefault(tag, set()).add(key)
+            self.stats.sets += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+                for key in self._tag_keys.pop(tag, set()):
+                    if key in self._entries:
+                        self._remove(key)
+                self.stats.invalidations += 1
+
+    def _remove(self, key):
+        _, tags, _ = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+    def describe(self):
+        return {"backend": "memory", "entries": len(self._entries), "max_entries": self.max_entries,
+                **self.stats.as_dict()}
+
+class LocalStore:
+    # Minimal shared-store interface (get_many / set / incr) over a dict, standing in for
+    # Redis in tests and single-process runs. Evicts the oldest entries beyond max_entries.
+    # Counters (the tag versions) live outside the LRU and are never evicted: a version
+    # falling back to 0 would make entries written before an invalidation readable again.
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._data = OrderedDict() # key -> (expires_at or None, value)
+        self._counters = {} # key -> int, one per tag
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        with self._lock:
+            values = []
+            for key in keys:
+                if key in self._counters:
+                    values.append(self._counters[key])
+                    continue
+                entry = self._data.get(key)
+                if entry is not None and entry[0] is not None and entry[0] < now:
+                    del self._data[key]
+                    entry = None
+                values.append(entry[1] if entry is not None else None)
+            return values
+
+    def set(self, key, value, ttl_seconds=None):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (time.monotonic() + ttl_seconds if ttl_seconds else None, value)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def info(self):
+        return {"entries": len(self._data), "counters": len(self._counters), "evictions": self.evictions}
+
+class RedisStore:
+    # The same interface over a Redis client; eviction is Redis' own (maxmemory-policy). Entries
+    # have a TTL and tag versions don't, so use a volatile-* policy: it never evicts the versions.
+    def __init__(self, url: str = CACHE_URL):
+        import redis # optional dependency, only needed for CACHE_BACKEND=redis
+        self.client = redis.Redis.from_url(url)
+
+    def get_many(self, keys):
+        return self.client.mget(keys)
+
+    def set(self, key, value, ttl_seconds=None):
+        self.client.set(key, value, ex=ttl_seconds)
+
+    def incr(self, key):
+        return self.client.incr(key)
+
+    def info(self):
+        stats = self.client.info("stats")
+        return {"evictions": stats.get("evicted_keys"), "expired": stats.get("expired_keys")}
+
+class SharedStoreBackend:
+    KEY_PREFIX = "tracker:cache:"
+
+    def __init__(self, store, ttl_seconds: int = CACHE_TTL_SECONDS):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats() # hits/misses as seen by this worker
+
+    def _tag_key(self, tag):
+        return f"{self.KEY_PREFIX}tag:{tag}"
+
+    def token(self, tags):
+        if not tags:
+            return ()
+        return tuple(int(version or 0) for version in self.store.get_many([self._tag_key(tag) for tag in tags]))
+
+    def _entry_key(self, key, token):
+        return f"{self.KEY_PREFIX}{key}@{'.'.join(map(str, token))}"
+
+    def get(self, key, tags):
+        # One round trip for the tag versions, one for the entry
+        (data,) = self.store.get_many([self._entry_key(key, self.token(tags))])
+        if data is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return serializers.loads(data)
+
+    def set(self, key, value, tags, token):
+        # Keyed by the versions read before loading; if a write bumped them meanwhile,
+        # this entry is simply never read
+        self.store.set(self._entry_key(key, token), serializers.dumps(value), self.ttl_seconds)
+        self.stats.sets += 1
+
+    def invalidate(self, tags):
+        for tag in tags:
+            self.store.incr(self._tag_key(tag))
+            self.stats.invalidations += 1
+
+    def describe(self):
+        return {"backend": type(self.store).__name__, **self.stats.as_dict(), "store": self.store.info()}
+
+def build_backend(name: str = CACHE_BACKEND):
+    if name == "memory":
+        return MemoryLRUBackend()
+    if name == "local":
+        return SharedStoreBackend(LocalStore())
+    if name == "redis":
+        return SharedStoreBackend(RedisStore())
+    raise ValueError(f"Unknown CACHE_BACKEND: {name}")
+
+backend = build_backend()
+
+def get_or_load(key: str, tags, loader):
+    # Read-through: returns the cached payload, or calls loader() and caches its result.
+    # None results (e.g. "not found") are not cached.
+    tags = list(tags)
+    try:
+        value = backend.get(key, tags)
+        if value is not None:
+            return value
+        token = backend.token(tags)
+    except Exception:
+        # The cache must never take reads down with it
+        logger.exception("Cache read failed for %s", key)
+        return loader()
+    value = loader()
+    if value is not None:
+        try:
+            backend.set(key, value, tags, token)
+        except Exception:
+            logger.exception("Cache write failed for %s", key)
+    return value
+
+def invalidate(tags):
+    try:
+        backend.invalidate(list(tags))
+    except Exception:
+        logger.exception("Cache invalidation failed for %s", tags)
+
+def project_tags(project_ids):
+    # Everything that shows a project's data or counters
+    return ["projects"] + [f"project:{project_id}" for project_id in set(project_ids)]
+
+def stats():
+    return backend.describe()
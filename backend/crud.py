@@ -1,6 +1,8 @@
 # project_tracker_backend/crud.py
+from datetime import date, datetime
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from . import models, schemas
+from . import models, schemas, history, cache, reminders
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -23,6 +25,7 @@ def create_user(db: Session, user: schemas.UserCreate):
     db_user = models.User(username=user.username, email=user.email, password_hash=hashed_password)
     db.add(db_user)
     db.commit()
+    cache.invalidate(["users"])
     db.refresh(db_user)
     return db_user
 
@@ -32,11 +35,17 @@ def get_user(db: Session, user_id: int):
 def get_users(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.User).offset(skip).limit(limit).all()
 
+def get_existing_user_ids(db: Session, user_ids):
+    if not user_ids:
+        return set()
+    return {user_id for (user_id,) in db.query(models.User.id).filter(models.User.id.in_(user_ids))}
+
 # Project operations
 def create_project(db: Session, project: schemas.ProjectCreate, user_id: int):
     db_project = models.Project(**project.dict(), created_by=user_id)
     db.add(db_project)
     db.commit()
+    cache.invalidate(["projects"])
     db.refresh(db_project)
     return db_project
 
@@ -54,6 +63,8 @@ def update_project(db: Session, project_id: int, project_update: schemas.Project
         for key, value in project_update.dict(exclude_unset=True).items():
             setattr(db_project, key, value)
         db.commit()
+        # Task lists embed the project, so they go too
+        cache.invalidate(cache.project_tags([project_id]))
         db.refresh(db_project)
     return db_project
 
@@ -62,41 +73,320 @@ def delete_project(db: Session, project_id: int):
     if db_project:
         db.delete(db_project)
         db.commit()
+        cache.invalidate(cache.project_tags([project_id]))
         return True
     return False
 
+def delete_project_tasks_batch(db: Session, project_id: int, model, batch_size: int):
+    # Deletes up to batch_size hot (models.Task) or archived (models.ArchivedTask) tasks of a
+    # project, keeping its counters right so a cancelled deletion leaves a consistent project.
+    # Returns how many rows were deleted. The caller commits, then invalidates
+    # cache.project_tags([project_id]).
+    ids = [task_id for (task_id,) in db.query(model.id).filter(model.project_id == project_id).limit(batch_size)]
+    if not ids:
+        return 0
+    status_counts = db.query(model.status, func.count(model.id)).filter(model.id.in_(ids)).group_by(model.status).all()
+    for status, count in status_counts:
+        _bump_project_counters(db, project_id, status, -count)
+    db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+    return len(ids)
+
+# Project task counters
+COUNTER_COLUMNS = ["task_count"] + list(models.STATUS_COUNTER_COLUMNS.values())
+
+def _bump_project_counters(db: Session, project_id: int, status: str, delta: int):
+    # Atomic in-database increment, applied in the caller's transaction so the
+    # counters commit (or roll back) together with the task write.
+    values = {models.Project.task_count: models.Project.task_count + delta}
+    column_name = models.STATUS_COUNTER_COLUMNS.get(status)
+    if column_name:
+        column = getattr(models.Project, column_name)
+        values[column] = column + delta
+    db.query(models.Project).filter(models.Project.id == project_id).update(values, synchronize_session=False)
+
+def _apply_counter_deltas(db: Session, deltas: dict):
+    # deltas: {(project_id, status): delta}, collected over many task writes. Issues one
+    # UPDATE per project instead of one (or two) per task; zero net changes are skipped.
+    by_project = {}
+    for (project_id, status), delta in deltas.items():
+        columns = by_project.setdefault(project_id, {})
+        columns["task_count"] = columns.get("task_count", 0) + delta
+        column_name = models.STATUS_COUNTER_COLUMNS.get(status)
+        if column_name:
+            columns[column_name] = columns.get(column_name, 0) + delta
+    for project_id, columns in by_project.items():
+        values = {
+            getattr(models.Project, name): getattr(models.Project, name) + delta
+            for name, delta in columns.items() if delta
+        }
+        if values:
+            db.query(models.Project).filter(models.Project.id == project_id).update(values, synchronize_session=False)
+
+def _count_project_tasks(db: Session, project_ids=None):
+    # Recomputes the counters from the hot and archived task tables: {project_id: {column: count}}
+    # Archiving moves rows between the two without touching the counters.
+    counts = {}
+    for model in (models.Task, models.ArchivedTask):
+        query = db.query(model.project_id, model.status, func.count(model.id))
+        if project_ids is not None:
+            query = query.filter(model.project_id.in_(project_ids))
+        for project_id, status, count in query.group_by(model.project_id, model.status):
+            project_counts = counts.setdefault(project_id, dict.fromkeys(COUNTER_COLUMNS, 0))
+            project_counts["task_count"] += count
+            column_name = models.STATUS_COUNTER_COLUMNS.get(status)
+            if column_name:
+                project_counts[column_name] += count
+    return counts
+
+def check_project_counters(db: Session, project_ids=None, repair: bool = False):
+    # Compares stored counters against the tasks table and returns every drifted project.
+    # With repair=True the stored counters are overwritten with the recomputed values.
+    actual_counts = _count_project_tasks(db, project_ids)
+    query = db.query(models.Project)
+    if project_ids is not None:
+        query = query.filter(models.Project.id.in_(project_ids))
+    drifted = []
+    for db_project in query.order_by(models.Project.id):
+        stored = {column: getattr(db_project, column) or 0 for column in COUNTER_COLUMNS}
+        actual = actual_counts.get(db_project.id, dict.fromkeys(COUNTER_COLUMNS, 0))
+        if stored != actual:
+            drifted.append({"project_id": db_project.id, "stored": stored, "actual": actual})
+            if repair:
+                for column, value in actual.items():
+                    setattr(db_project, column, value)
+    if repair and drifted:
+        db.commit()
+        cache.invalidate(cache.project_tags(drift["project_id"] for drift in drifted))
+    return drifted
+
 # Task operations
 def create_task(db: Session, task: schemas.TaskCreate, created_by_user_id: int):
     db_task = models.Task(**task.dict(), created_by=created_by_user_id)
+    if db_task.status == "Done":
+        db_task.completed_at = datetime.utcnow()
     db.add(db_task)
+    _bump_project_counters(db, db_task.project_id, db_task.status, 1)
+    project_id = db_task.project_id # read before the commit expires db_task
     db.commit()
+    cache.invalidate(cache.project_tags([project_id]))
     db.refresh(db_task)
+    history.record([history.entry(db_task, history.CREATED, None, db_task.title, changed_by=created_by_user_id)])
+    reminders.track(db_task.id, db_task.status, db_task.due_date)
     return db_task
 
+def bulk_create_tasks(db: Session, project_id: int, tasks, created_by_user_id: int):
+    # One transaction and one counter UPDATE per status for the whole batch
+    db_tasks = []
+    status_counts = {}
+    now = datetime.utcnow()
+    for task in tasks:
+        db_task = models.Task(**task.dict(), project_id=project_id, created_by=created_by_user_id)
+        if db_task.status == "Done":
+            db_task.completed_at = now
+        db_tasks.append(db_task)
+        status_counts[db_task.status] = status_counts.get(db_task.status, 0) + 1
+    db.add_all(db_tasks)
+    for status, count in status_counts.items():
+        _bump_project_counters(db, project_id, status, count)
+    # Flush to get the ids, then read everything the history and reminders need before the
+    # commit expires the instances (reading them afterwards reloads each row separately)
+    db.flush()
+    created = [
+        history.entry(db_task, history.CREATED, None, db_task.title, changed_by=created_by_user_id)
+        for db_task in db_tasks
+    ]
+    tracked = [(db_task.id, db_task.status, db_task.due_date) for db_task in db_tasks]
+    db.commit()
+    cache.invalidate(cache.project_tags([project_id]))
+    history.record(created)
+    for task_id, status, due_date in tracked:
+        reminders.track(task_id, status, due_date)
+    return db_tasks
+
 def get_task(db: Session, task_id: int):
     return db.query(models.Task).filter(models.Task.id == task_id).first()
 
-def get_tasks_by_project(db: Session, project_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Task).filter(models.Task.project_id == project_id).offset(skip).limit(limit).all()
+def get_tasks_by_project(db: Session, project_id: int, skip: int = 0, limit: int = 100, include_archived: bool = False):
+    query = db.query(models.Task).filter(models.Task.project_id == project_id)
+    if include_archived:
+        archived_query = db.query(models.ArchivedTask).filter(models.ArchivedTask.project_id == project_id)
+        return _with_archived(db, query, archived_query, skip, limit)
+    return query.offset(skip).limit(limit).all()
 
-def get_all_tasks(db: Session, skip: int = 0, limit: int = 100):
+def get_all_tasks(db: Session, skip: int = 0, limit: int = 100, include_archived: bool = False):
+    if include_archived:
+        return _with_archived(db, db.query(models.Task), db.query(models.ArchivedTask), skip, limit)
     return db.query(models.Task).offset(skip).limit(limit).all()
 
-def update_task(db: Session, task_id: int, task_update: schemas.TaskUpdate):
-    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
+def _with_archived(db: Session, hot_query, archived_query, skip: int, limit: int):
+    # Pages through hot rows first, then continues into the archive
+    hot_total = hot_query.count()
+    tasks = hot_query.order_by(models.Task.id).offset(skip).limit(limit).all() if skip < hot_total else []
+    remaining = limit - len(tasks)
+    if remaining > 0:
+        archived_skip = max(0, skip - hot_total)
+        tasks += archived_query.order_by(models.ArchivedTask.id).offset(archived_skip).limit(remaining).all()
+    return tasks
+
+def get_archived_task(db: Session, task_id: int):
+    return db.query(models.ArchivedTask).filter(models.ArchivedTask.id == task_id).first()
+
+def get_archived_tasks(db: Session, project_id: int = None, skip: int = 0, limit: int = 100):
+    query = db.query(models.ArchivedTask)
+    if project_id is not None:
+        query = query.filter(models.ArchivedTask.project_id == project_id)
+    return query.order_by(models.ArchivedTask.id).offset(skip).limit(limit).all()
+
+def get_tasks_for_assignee(db: Session, user_id: int, statuses=None, exclude_statuses=None,
+                           due_from=None, due_to=None, skip: int = 0, limit: int = 100):
+    # Filters line up with ix_tasks_assigned_to_status_due_date (assigned_to, status, due_date)
+    query = db.query(models.Task).filter(models.Task.assigned_to == user_id)
+    if statuses:
+        query = query.filter(models.Task.status.in_(statuses))
+    if exclude_statuses:
+        query = query.filter(models.Task.status.notin_(exclude_statuses))
+    if due_from is not None:
+        query = query.filter(models.Task.due_date >= due_from)
+    if due_to is not None:
+        query = query.filter(models.Task.due_date <= due_to)
+    return (
+        query.order_by(models.Task.due_date.asc().nullslast(), models.Task.id)
+        .offset(skip).limit(limit).all()
+    )
+
+def _apply_task_update(db: Session, db_task: models.Task, update_data: dict, counter_deltas: dict, changed_by: int = None):
+    # Shared by update_task and bulk_update_tasks. Counter changes are added to counter_deltas
+    # for the caller to apply with _apply_counter_deltas; the caller commits, then records the
+    # returned history entries (one per field that actually changed).
+    old_project_id, old_status = db_task.project_id, db_task.status
+    changes = []
+    for key, value in update_data.items():
+        old_value = getattr(db_task, key)
+        if old_value != value:
+            changes.append(history.entry(db_task, key, old_value, value, changed_by=changed_by))
+        setattr(db_task, key, value)
+    if db_task.status != old_status:
+        db_task.completed_at = datetime.utcnow() if db_task.status == "Done" else None
+    if (db_task.project_id, db_task.status) != (old_project_id, old_status):
+        old_key, new_key = (old_project_id, old_status), (db_task.project_id, db_task.status)
+        counter_deltas[old_key] = counter_deltas.get(old_key, 0) - 1
+        counter_deltas[new_key] = counter_deltas.get(new_key, 0) + 1
+    return changes
+
+def update_task(db: Session, task_id: int, task_update: schemas.TaskUpdate, changed_by: int = None):
+    # Row lock: the counter deltas are computed from the old status/project, which a concurrent
+    # writer must not change in between (no-op on SQLite)
+    db_task = db.query(models.Task).filter(models.Task.id == task_id).with_for_update().first()
     if db_task:
+        old_project_id = db_task.project_id
+        counter_deltas = {}
         # Use exclude_unset=True to only update provided fields
-        update_data = task_update.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_task, key, value)
+        changes = _apply_task_update(db, db_task, task_update.dict(exclude_unset=True), counter_deltas, changed_by=changed_by)
+        _apply_counter_deltas(db, counter_deltas)
+        new_project_id = db_task.project_id # read before the commit expires db_task
         db.commit()
+        cache.invalidate(cache.project_tags([old_project_id, new_project_id]))
         db.refresh(db_task)
+        history.record(changes)
+        reminders.track(db_task.id, db_task.status, db_task.due_date)
     return db_task
 
-def delete_task(db: Session, task_id: int):
-    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
+# Fields a batch item may assert in `base` (the client's last known values)
+BATCH_BASE_FIELDS = ("title", "description", "status", "due_date", "assigned_to", "project_id")
+
+def _comparable(value):
+    # Clients send JSON, so compare dates in their ISO form
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+def bulk_update_tasks(db: Session, items, changed_by: int = None):
+    # Applies many task updates in one transaction. An item whose `base` values no longer match
+    # the stored row (someone else changed it) is skipped and reported as a conflict.
+    ids = {item.id for item in items}
+    # Row locks make the base check and the write atomic against concurrent writers (no-op on SQLite)
+    db_tasks = {
+        db_task.id: db_task
+        for db_task in db.query(models.Task).filter(models.Task.id.in_(ids)).with_for_update()
+    }
+    updated, conflicts, missing, changes = [], [], [], []
+    touched_project_ids = set()
+    counter_deltas = {}
+    for item in items:
+        db_task = db_tasks.get(item.id)
+        if db_task is None:
+            missing.append(item.id)
+            continue
+        mismatched = {}
+        for field, expected in (item.base or {}).items():
+            if field not in BATCH_BASE_FIELDS:
+                continue
+            actual = _comparable(getattr(db_task, field))
+            if actual != expected:
+                mismatched[field] = {"expected": expected, "actual": actual}
+        if mismatched:
+            conflicts.append({"id": db_task.id, "fields": mismatched, "current": db_task})
+            continue
+        touched_project_ids.add(db_task.project_id)
+        changes += _apply_task_update(db, db_task, item.changes.dict(exclude_unset=True), counter_deltas, changed_by=changed_by)
+        touched_project_ids.add(db_task.project_id)
+        if db_task not in updated:
+            updated.append(db_task)
+    _apply_counter_deltas(db, counter_deltas)
+    db.commit()
+    if touched_project_ids:
+        cache.invalidate(cache.project_tags(touched_project_ids))
+    # The commit expired every loaded task (updated and conflicting ones are both returned);
+    # reload them in one query rather than one refresh per row
+    if db_tasks:
+        db.query(models.Task).filter(models.Task.id.in_(db_tasks.keys())).all()
+    for db_task in updated:
+        reminders.track(db_task.id, db_task.status, db_task.due_date)
+    history.record(changes)
+    return {"updated": updated, "conflicts": conflicts, "missing": missing}
+
+def delete_task(db: Session, task_id: int, changed_by: int = None):
+    # Row lock: a concurrent delete waits, then finds no row, so the counters drop only once
+    db_task = db.query(models.Task).filter(models.Task.id == task_id).with_for_update().first()
     if db_task:
+        deleted = history.entry(db_task, history.DELETED, db_task.title, None, changed_by=changed_by)
+        _bump_project_counters(db, db_task.project_id, db_task.status, -1)
         db.delete(db_task)
         db.commit()
+        cache.invalidate(cache.project_tags([deleted["project_id"]]))
+        history.record([deleted])
+        reminders.forget(task_id)
         return True
-    return False
\ No newline at end of file
+    return False
+
+# Task history
+def get_task_history(db: Session, task_id: int = None, project_id: int = None, skip: int = 0, limit: int = 100):
+    # Newest first; served by ix_task_history_task_id_changed_at / ix_task_history_project_id_changed_at
+    query = db.query(models.TaskHistory)
+    if task_id is not None:
+        query = query.filter(models.TaskHistory.task_id == task_id)
+    if project_id is not None:
+        query = query.filter(models.TaskHistory.project_id == project_id)
+    return (
+        query.order_by(models.TaskHistory.changed_at.desc(), models.TaskHistory.id.desc())
+        .offset(skip).limit(limit).all()
+    )
+
+# In-app notifications (written by reminders.TableSink)
+def get_notifications(db: Session, user_id: int, unread_only: bool = False, skip: int = 0, limit: int = 100):
+    # Newest first; served by ix_notifications_user_id_created_at
+    query = db.query(models.Notification).filter(models.Notification.user_id == user_id)
+    if unread_only:
+        query = query.filter(models.Notification.read_at.is_(None))
+    return (
+        query.order_by(models.Notification.created_at.desc(), models.Notification.id.desc())
+        .offset(skip).limit(limit).all()
+    )
+
+def mark_notification_read(db: Session, notification_id: int, user_id: int):
+    db_notification = db.query(models.Notification).filter(
+        models.Notification.id == notification_id, models.Notification.user_id == user_id,
+    ).first()
+    if db_notification and db_notification.read_at is None:
+        db_notification.read_at = datetime.utcnow()
+        db.commit()
+        db.refresh(db_notification)
+    return db_notification
@@ -0,0 +1,98 @@
+# project_tracker_backend/history.py
+# Append-only task change history. The crud mutation functions capture field-level diffs and
+# hand them to an in-process buffer after their own commit; a background task writes the
+# buffer out with multi-row INSERTs, so task writes never pay for an extra synchronous INSERT.
+# Entries buffered in a worker that crashes (rather than shutting down) are lost; a clean
+# shutdown flushes everything.
+import logging
+import os
+import threading
+from datetime import date, datetime
+
+from sqlalchemy import insert
+
+from . import models
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FLUSH_INTERVAL_SECONDS = float(os.getenv("HISTORY_FLUSH_INTERVAL_SECONDS", "2"))
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "500")) # rows per INSERT statement
+HISTORY_MAX_PENDING = int(os.getenv("HISTORY_MAX_PENDING", "5000")) # memory bound per worker
+
+# Pseudo-fields for whole-task events
+CREATED = "created"
+DELETED = "deleted"
+
+def _as_text(value):
+    if value is None:
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+def entry(db_task, field: str, old_value, new_value, changed_by: int = None):
+    # changed_at is taken now, not at flush time, so history stays in mutation order
+    return {
+        "task_id": db_task.id,
+        "project_id": db_task.project_id,
+        "field": field,
+        "old_value": _as_text(old_value),
+        "new_value": _as_text(new_value),
+        "changed_by": changed_by,
+        "changed_at": datetime.utcnow(),
+    }
+
+class HistoryBuffer:
+    def __init__(self, batch_size: int = HISTORY_BATCH_SIZE, max_pending: int = HISTORY_MAX_PENDING):
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending = []
+        self._lock = threading.Lock() # guards _pending; crud runs in FastAPI's threadpool
+        self._flush_lock = threading.Lock() # one flush at a time
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, entries):
+        if not entries:
+            return
+        with self._lock:
+            self._pending.extend(entries)
+            full = len(self._pending) >= self.max_pending
+        if full:
+            # Backpressure: the writer that hits the bound pays for the flush instead of memory growing
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Task history flush failed")
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            db = SessionLocal()
+            try:
+                for start in range(0, len(rows), self.batch_size):
+                    db.execute(insert(models.TaskHistory).values(rows[start:start + self.batch_size]))
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    # Keep the rows for the next attempt, but never more than max_pending
+                    self._pending[:0] = rows
+                    overflow = len(self._pending) - self.max_pending
+                    if overflow > 0:
+                        del self._pending[:overflow]
+                        logger.error("Dropped %d task history entries while the database was unavailable", overflow)
+                raise
+            finally:
+                db.close()
+            return len(rows)
+
+buffer = HistoryBuffer()
+
+def record(entries):
+    buffer.record(entries)
@@ -0,0 +1,306 @@
+# project_tracker_backend/jobs.py
+# In-process background jobs for heavy operations (project deletion, bulk import, export,
+# counter recomputation). Endpoints submit a job and return 202 right away; the work runs on
+# a small dedicated thread pool, separate from the threadpool FastAPI uses for requests, so
+# JOB_MAX_CONCURRENCY bounds how much of the worker large jobs can take. Progress and
+# results live in the jobs table and are polled through GET /jobs/{id}.
+# Jobs run in the worker that accepted them, which records itself as the job's owner and keeps
+# a lease on it by refreshing heartbeat_at (see maintain()). A clean shutdown cancels the
+# worker's queued jobs; jobs whose owner died stop being heartbeated and are marked failed by
+# any live worker once the lease runs out.
+import csv
+import io
+import json
+import logging
+import os
+import socket
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
+from sqlalchemy.orm import Session, defer
+
+from . import cache, crud, models, schemas
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+JOB_MAX_CONCURRENCY = int(os.getenv("JOB_MAX_CONCURRENCY", "2"))
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", "500")) # rows per transaction inside a job
+JOB_HEARTBEAT_SECONDS = int(os.getenv("JOB_HEARTBEAT_SECONDS", "15"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "90")) # no heartbeat for this long: owner is gone
+JOB_SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv("JOB_SHUTDOWN_TIMEOUT_SECONDS", "10"))
+
+# Unique per process, so a restarted worker never mistakes an old lease for its own
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+UNFINISHED_STATUSES = ("queued", "running")
+
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+_executor = ThreadPoolExecutor(max_workers=JOB_MAX_CONCURRENCY, thread_name_prefix="job")
+_cancelled_ids = set() # fast path for cancellations requested in this worker
+_local_ids = set() # jobs submitted to this worker's executor that haven't finished
+_futures = {} # job id -> executor future, for the bounded wait on shutdown
+
+HANDLERS = {}
+
+def handler(kind: str):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+class JobCancelled(Exception):
+    pass
+
+class JobContext:
+    # Handed to every job handler: a private session plus progress reporting, which is
+    # also where cancellation is noticed
+    def __init__(self, db: Session, job: models.Job):
+        self.db = db
+        self.job = job
+
+    def progress(self, done: int, total: int = None, message: str = None):
+        job = self.job
+        job.done = done
+        if total is not None:
+            job.total = total
+        if message is not None:
+            job.message = message
+        job.progress = min(1.0, done / job.total) if job.total else 0.0
+        job.heartbeat_at = datetime.utcnow()
+        self.db.commit()
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        if self.job.id in _cancelled_ids:
+            raise JobCancelled()
+        # Another worker may have recorded the request
+        self.db.refresh(self.job, attribute_names=["cancel_requested"])
+        if self.job.cancel_requested:
+            raise JobCancelled()
+
+def submit(db: Session, kind: str, params: dict, created_by: int = None):
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = models.Job(kind=kind, status="queued", params_json=json.dumps(jsonable_encoder(params)),
+                     progress=0.0, done=0, cancel_requested=False, created_by=created_by,
+                     worker_id=WORKER_ID, heartbeat_at=datetime.utcnow())
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    # The executor queues anything beyond JOB_MAX_CONCURRENCY
+    _local_ids.add(job.id)
+    _futures[job.id] = _executor.submit(_run, job.id)
+    return job
+
+def get_job(db: Session, job_id: int):
+    return db.query(models.Job).filter(models.Job.id == job_id).first()
+
+def get_jobs(db: Session, created_by: int, skip: int = 0, limit: int = 100):
+    # Listing returns neither params nor results (an import's params hold every row), so don't load them
+    return (
+        db.query(models.Job).options(defer(models.Job.params_json), defer(models.Job.result_json)).filter(models.Job.created_by == created_by)
+        .order_by(models.Job.created_at.desc(), models.Job.id.desc())
+        .offset(skip).limit(limit).all()
+    )
+
+def cancel(db: Session, job: models.Job):
+    if job.status in FINISHED_STATUSES:
+        return job
+    _cancelled_ids.add(job.id)
+    job.cancel_requested = True
+    if job.status == "queued":
+        # Never started: it will be skipped when the executor reaches it
+        job.status = "cancelled"
+        job.finished_at = datetime.utcnow()
+    db.commit()
+    db.refresh(job)
+    return job
+
+def shutdown(timeout: float = JOB_SHUTDOWN_TIMEOUT_SECONDS):
+    # Stop queued jobs from starting and ask running ones to stop at their next progress report,
+    # then wait (up to timeout) for them to get there. Queued jobs of this worker will never run,
+    # so they are finished as cancelled right away. Runs before the final history flush, so
+    # entries recorded by a job's last committed batch are still written out.
+    _executor.shutdown(wait=False, cancel_futures=True)
+    local_ids = set(_local_ids)
+    if not local_ids:
+        return
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        for job in db.query(models.Job).filter(models.Job.id.in_(local_ids), models.Job.status.in_(UNFINISHED_STATUSES)):
+            _cancelled_ids.add(job.id)
+            if job.status == "queued":
+                job.status = "cancelled"
+                job.cancel_requested = True
+                job.message = "Cancelled by shutdown"
+                job.finished_at = now
+        db.commit()
+    finally:
+        db.close()
+    running = [future for future in _futures.values() if not future.done()]
+    if running:
+        _, still_running = wait(running, timeout=timeout)
+        if still_running:
+            logger.warning("%d job(s) still running at shutdown; their leases will expire", len(still_running))
+
+def heartbeat(db: Session):
+    # Renews the lease on every unfinished job this worker owns
+    local_ids = set(_local_ids)
+    if not local_ids:
+        return 0
+    renewed = db.query(models.Job).filter(
+        models.Job.id.in_(local_ids), models.Job.worker_id == WORKER_ID, models.Job.status.in_(UNFINISHED_STATUSES),
+    ).update({models.Job.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    return renewed
+
+def fail_abandoned(db: Session):
+    # Unfinished jobs whose lease ran out belong to a worker that died without shutting down,
+    # so nobody will ever finish them. Rows without a heartbeat (created before leases
+    # existed) are judged by created_at. A single conditional UPDATE, so a lease renewed
+    # meanwhile is never overridden.
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_LEASE_SECONDS)
+    abandoned = db.query(models.Job).filter(
+        models.Job.status.in_(UNFINISHED_STATUSES),
+        func.coalesce(models.Job.heartbeat_at, models.Job.created_at) < cutoff,
+    ).update({
+        models.Job.status: "failed",
+        models.Job.error: "The worker running this job stopped before it finished",
+        models.Job.finished_at: datetime.utcnow(),
+    }, synchronize_session=False)
+    db.commit()
+    if abandoned:
+        logger.warning("Marked %d abandoned job(s) as failed", abandoned)
+    return abandoned
+
+def maintain():
+    # Run every JOB_HEARTBEAT_SECONDS in each worker (see background.py)
+    db = SessionLocal()
+    try:
+        heartbeat(db)
+        fail_abandoned(db)
+    finally:
+        db.close()
+
+def _run(job_id: int):
+    db = SessionLocal()
+    try:
+        job = get_job(db, job_id)
+        if job is None or job.status != "queued" or job.cancel_requested:
+            return
+        job.status = "running"
+        job.started_at = job.heartbeat_at = datetime.utcnow()
+        job.worker_id = WORKER_ID
+        db.commit()
+        try:
+            result = HANDLERS[job.kind](JobContext(db, job), **job.params)
+            outcome = {"status": "succeeded", "progress": 1.0, "result_json": json.dumps(jsonable_encoder(result))}
+        except JobCancelled:
+            db.rollback()
+            outcome = {"status": "cancelled"}
+        except Exception as e:
+            db.rollback()
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            outcome = {"status": "failed", "error": str(e)}
+        outcome["finished_at"] = datetime.utcnow()
+        # Only a job still running here is finished: if its lease expired (e.g. the worker was
+        # stalled) another worker has already failed it, and that status stands
+        finished = db.query(models.Job).filter(
+            models.Job.id == job_id, models.Job.status == "running", models.Job.worker_id == WORKER_ID,
+        ).update(outcome, synchronize_session=False)
+        db.commit()
+        if not finished:
+            logger.warning("Job %s finished after its lease expired; keeping the status set by another worker", job_id)
+    finally:
+        _cancelled_ids.discard(job_id)
+        _local_ids.discard(job_id)
+        _futures.pop(job_id, None)
+        db.close()
+
+# --- Job handlers ---
+
+@handler("delete_project")
+def delete_project_job(ctx: JobContext, project_id: int):
+    # Deletes tasks in batches (each its own short transaction) before removing the project
+    db = ctx.db
+    total = (
+        db.query(models.Task).filter(models.Task.project_id == project_id).count()
+        + db.query(models.ArchivedTask).filter(models.ArchivedTask.project_id == project_id).count()
+    )
+    done = 0
+    ctx.progress(done, total, "Deleting tasks")
+    for model in (models.Task, models.ArchivedTask):
+        while True:
+            deleted = crud.delete_project_tasks_batch(db, project_id, model, JOB_BATCH_SIZE)
+            if not deleted:
+                break
+            done += deleted
+            try:
+                ctx.progress(done) # commits the batch
+            finally:
+                # Committed even when progress() raises JobCancelled; cached task lists and
+                # counters of the project are stale either way
+                cache.invalidate(cache.project_tags([project_id]))
+    crud.delete_project(db, project_id)
+    return {"project_id": project_id, "deleted_tasks": done}
+
+@handler("recompute_counters")
+def recompute_counters_job(ctx: JobContext, repair: bool = False):
+    db = ctx.db
+    project_ids = [project_id for (project_id,) in db.query(models.Project.id).order_by(models.Project.id)]
+    drifted = []
+    ctx.progress(0, len(project_ids), "Checking project counters")
+    for start in range(0, len(project_ids), JOB_BATCH_SIZE):
+        chunk = project_ids[start:start + JOB_BATCH_SIZE]
+        drifted += crud.check_project_counters(db, project_ids=chunk, repair=repair)
+        ctx.progress(start + len(chunk))
+    return {"repaired": repair, "drifted": drifted}
+
+EXPORT_COLUMNS = ["id", "title", "description", "status", "due_date", "project_id",
+                  "assigned_to", "created_by", "created_at", "completed_at"]
+
+@handler("export_tasks")
+def export_tasks_job(ctx: JobContext, project_id: int, include_archived: bool = False):
+    # CSV export. Rows are read in id-ordered pages, but the whole CSV is built in memory and
+    # stored as the job result; it is returned by GET /jobs/{id}, not by the job listing.
+    db = ctx.db
+    models_to_export = [models.Task] + ([models.ArchivedTask] if include_archived else [])
+    total = sum(db.query(model).filter(model.project_id == project_id).count() for model in models_to_export)
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(EXPORT_COLUMNS)
+    done = 0
+    ctx.progress(done, total, "Exporting tasks")
+    for model in models_to_export:
+        last_id = 0
+        while True:
+            rows = (
+                db.query(model).filter(model.project_id == project_id, model.id > last_id)
+                .order_by(model.id).limit(JOB_BATCH_SIZE).all()
+            )
+            if not rows:
+                break
+            for row in rows:
+                writer.writerow([getattr(row, column) for column in EXPORT_COLUMNS])
+            last_id = rows[-1].id
+            done += len(rows)
+            ctx.progress(done)
+    return {"format": "csv", "rows": done, "content": output.getvalue()}
+
+@handler("import_tasks")
+def import_tasks_job(ctx: JobContext, project_id: int, tasks: list, created_by: int):
+    db = ctx.db
+    rows = [schemas.TaskImportRow(**row) for row in tasks]
+    imported = 0
+    ctx.progress(imported, len(rows), "Importing tasks")
+    for start in range(0, len(rows), JOB_BATCH_SIZE):
+        chunk = rows[start:start + JOB_BATCH_SIZE]
+        crud.bulk_create_tasks(db, project_id, chunk, created_by_user_id=created_by)
+        imported += len(chunk)
+        ctx.progress(imported)
+    return {"project_id": project_id, "imported": imported}
@@ -0,0 +1,73 @@
+# project_tracker_backend/loaders.py
+# Request-scoped batch loader for the users and projects a response refers to.
+# Instead of lazy-loading task.project, project.creator, task.assignee and task.creator one
+# relationship at a time, callers collect the ids they need and the loader resolves them
+# with one `IN (...)` query per table, deduplicated for the whole request. Results are the
+# plain dicts the serializers emit, so they stay valid after the session commits.
+from itertools import chain
+
+from sqlalchemy.orm import Session
+
+from . import models
+from .serializers import PROJECT_FIELDS, USER_FIELDS
+
+class BatchLoader:
+    def __init__(self, db: Session):
+        self.db = db
+        self._users = {} # id -> user dict, or None when known not to exist
+        self._projects = {} # id -> project dict (with nested creator), or None
+
+    def prime_user(self, db_user):
+        # Seed with objects the request already has, e.g. the authenticated user
+        self._users.setdefault(db_user.id, {field: getattr(db_user, field) for field in USER_FIELDS})
+
+    def load(self, project_ids=(), user_ids=()):
+        # At most one query per table for everything not seen yet in this request
+        missing_projects = {project_id for project_id in project_ids if project_id is not None and project_id not in self._projects}
+        loaded_projects = []
+        if missing_projects:
+            columns = [getattr(models.Project, field) for field in PROJECT_FIELDS]
+            for row in self.db.query(*columns).filter(models.Project.id.in_(missing_projects)):
+                loaded_projects.append(dict(row._mapping))
+            for project_id in missing_projects:
+                self._projects[project_id] = None
+        creator_ids = (project["created_by"] for project in loaded_projects)
+
+        missing_users = {user_id for user_id in chain(user_ids, creator_ids) if user_id is not None and user_id not in self._users}
+        if missing_users:
+            columns = [getattr(models.User, field) for field in USER_FIELDS]
+            for row in self.db.query(*columns).filter(models.User.id.in_(missing_users)):
+                self._users[row.id] = dict(row._mapping)
+            for user_id in missing_users:
+                self._users.setdefault(user_id, None)
+
+        for project in loaded_projects:
+            project["creator"] = self._users.get(project["created_by"])
+            self._projects[project["id"]] = project
+
+    def prefetch(self, kind: str, db_rows):
+        # Everything list_payload(kind, db_rows) will ask for, in one batch
+        if kind == "task":
+            self.load(
+                project_ids={db_row.project_id for db_row in db_rows},
+                user_ids={user_id for db_row in db_rows for user_id in (db_row.assigned_to, db_row.created_by)},
+            )
+        elif kind == "project":
+            self.load(user_ids={db_row.created_by for db_row in db_rows})
+
+    def user(self, user_id):
+        if user_id is None:
+            return None
+        if user_id not in self._users:
+            self.load(user_ids=[user_id])
+        return self._users[user_id]
+
+    def project(self, project_id):
+        if project_id not in self._projects:
+            self.load(project_ids=[project_id])
+        return self._projects[project_id]
+
+    def forget_projects(self, project_ids):
+        # After a write changed them (e.g. task counters); the next access reloads
+        for project_id in project_ids:
+            self._projects.pop(project_id, None)
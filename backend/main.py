@@ -1,15 +1,22 @@
 # project_tracker_backend/main.py
-from fastapi import FastAPI, Depends, HTTPException, status
+import asyncio
+from fastapi import FastAPI, Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date, timedelta
 from fastapi.middleware.cors import CORSMiddleware # For enabling CORS
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 
-from . import models, schemas, crud, auth
-from .database import engine, get_db, Base
+from . import models, schemas, crud, auth, search, archive, serializers, history, jobs, cache, loaders, reminders
+from . import background
+from .compression import CompressionMiddleware
+from .database import get_db
 
-# Create database tables (this will run when the app starts if they don't exist)
-Base.metadata.create_all(bind=engine)
+# Importing this module has no database side effects: the schema is managed by Alembic
+# migrations (backend/migrations), applied once per deploy with `alembic upgrade head`
+# before any worker starts.
 
 app = FastAPI(
     title="Project Tracker API",
@@ -34,6 +41,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated gzip/brotli compression for responses above compression.MINIMUM_SIZE
+app.add_middleware(CompressionMiddleware)
+
+# Periodic background work (see background.py)
+if archive.ARCHIVE_ENABLED:
+    # Long-completed tasks move to archived_tasks (see archive.py)
+    background.start_background_loop(app, archive.run_archival_pass, archive.ARCHIVE_INTERVAL_SECONDS, initial_delay=0)
+# Batched task history writes (see history.py)
+background.start_background_loop(app, history.buffer.flush, history.HISTORY_FLUSH_INTERVAL_SECONDS)
+if reminders.REMINDERS_ENABLED:
+    # Due-date reminders (see reminders.py)
+    background.start_background_loop(app, reminders.run_tick, reminders.REMINDER_TICK_SECONDS, initial_delay=0)
+
+# Background jobs (see jobs.py): renew this worker's job leases and fail jobs whose owner is gone
+background.start_background_loop(app, jobs.maintain, jobs.JOB_HEARTBEAT_SECONDS)
+
+@app.on_event("shutdown")
+async def stop_jobs():
+    await asyncio.to_thread(jobs.shutdown)
+
+@app.on_event("shutdown")
+async def flush_history():
+    # Write out whatever is still buffered before the worker exits. Registered after stop_jobs,
+    # so it also catches the history of the last batches committed by stopping jobs.
+    await asyncio.to_thread(history.buffer.flush)
+
+def job_accepted(job: models.Job):
+    # Submit-and-poll response: 202 with the job, to be polled at GET /jobs/{id}
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(schemas.JobInDB.from_orm(job)),
+                        headers={"Location": f"/jobs/{job.id}"})
+
+def get_loader(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
+    # Request-scoped batch loader (see loaders.py), seeded with the already-loaded current user.
+    # FastAPI resolves get_db / get_current_user once per request, so it shares the request's session.
+    loader = loaders.BatchLoader(db)
+    loader.prime_user(current_user)
+    return loader
+
+# List endpoints return serializers.*_response directly: rows from our own database skip
+# response_model re-validation (the models still document the response shape). Clients
+# sending `Accept: application/vnd.tracker.columnar+json` get the compact columnar layout.
+
 # Root endpoint for testing
 @app.get("/")
 def read_root():
@@ -49,11 +98,25 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = auth.create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+    return auth.create_token_pair(user.username)
+
+@app.post("/token/refresh", response_model=schemas.Token)
+def refresh_access_token(body: schemas.TokenRefresh, db: Session = Depends(get_db)):
+    # Exchange a refresh token for a new access/refresh pair; the user must still exist
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    token_data = auth.verify_refresh_token(body.refresh_token, credentials_exception)
+    if crud.get_user_by_username(db, username=token_data.username) is None:
+        raise credentials_exception
+    return auth.create_token_pair(token_data.username)
+
+@app.get("/token/cache/stats")
+def read_token_cache_stats_endpoint(current_user: models.User = Depends(auth.get_current_user)):
+    # Hit rate of this worker's verified-token cache (see auth.TokenCache)
+    return auth.token_cache.stats()
 
 @app.post("/users/", response_model=schemas.UserInDB, status_code=status.HTTP_201_CREATED)
 def create_user_endpoint(user: schemas.UserCreate, db: Session = Depends(get_db)):
@@ -69,13 +132,49 @@ def create_user_endpoint(user: schemas.UserCreate, db: Session = Depends(get_db)
 async def read_users_me(current_user: models.User = Depends(auth.get_current_user)):
     return current_user
 
+# Due-date windows for /users/me/tasks, relative to today
+DUE_WINDOWS = ("overdue", "today", "week")
+
+@app.get("/users/me/tasks", response_model=List[schemas.TaskInDB])
+def read_my_tasks(status: Optional[List[str]] = Query(None), due: Optional[str] = None,
+                  due_from: Optional[date] = None, due_to: Optional[date] = None,
+                  skip: int = 0, limit: int = 100, db: Session = Depends(get_db),
+                  current_user: models.User = Depends(auth.get_current_user),
+                  layout: str = Depends(serializers.response_layout), loader: loaders.BatchLoader = Depends(get_loader)):
+    # Tasks assigned to the current user, soonest due first (undated tasks last)
+    exclude_statuses = None
+    if due is not None:
+        if due not in DUE_WINDOWS:
+            raise HTTPException(status_code=400, detail=f"due must be one of: {', '.join(DUE_WINDOWS)}")
+        today = date.today()
+        if due == "overdue":
+            due_to = today - timedelta(days=1)
+            # Finished tasks are never overdue unless explicitly asked for
+            if not status:
+                exclude_statuses = ["Done"]
+        elif due == "today":
+            due_from = due_to = today
+        elif due == "week":
+            due_from, due_to = today, today + timedelta(days=6 - today.weekday()) # through Sunday
+    tasks = crud.get_tasks_for_assignee(db, current_user.id, statuses=status, exclude_statuses=exclude_statuses,
+                                        due_from=due_from, due_to=due_to, skip=skip, limit=limit)
+    return serializers.tasks_response(tasks, layout, loader)
+
 @app.get("/users/", response_model=List[schemas.UserInDB])
 def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db),
-               current_user: models.User = Depends(auth.get_current_user)): # Protected
-    users = crud.get_users(db, skip=skip, limit=limit)
-    return users
+               current_user: models.User = Depends(auth.get_current_user), # Protected
+               layout: str = Depends(serializers.response_layout)):
+    payload = cache.get_or_load(
+        f"users:{skip}:{limit}:{layout}", ["users"],
+        lambda: serializers.list_payload("user", crud.get_users(db, skip=skip, limit=limit), layout),
+    )
+    return serializers.payload_response(payload, layout)
 
 # Project Endpoints
+def get_cached_project(loader: loaders.BatchLoader, project_id: int):
+    # Serialized project (with counters and creator), or None when it doesn't exist
+    return cache.get_or_load(f"project:{project_id}", [f"project:{project_id}"], lambda: loader.project(project_id))
+
 @app.post("/projects/", response_model=schemas.ProjectInDB, status_code=status.HTTP_201_CREATED)
 def create_project_endpoint(project: schemas.ProjectCreate, db: Session = Depends(get_db),
                             current_user: models.User = Depends(auth.get_current_user)):
@@ -83,17 +182,22 @@ def create_project_endpoint(project: schemas.ProjectCreate, db: Session = Depend
 
 @app.get("/projects/", response_model=List[schemas.ProjectInDB])
 def read_projects_endpoint(skip: int = 0, limit: int = 100, db: Session = Depends(get_db),
-                           current_user: models.User = Depends(auth.get_current_user)):
-    projects = crud.get_projects(db, skip=skip, limit=limit)
-    return projects
+                           current_user: models.User = Depends(auth.get_current_user),
+                           layout: str = Depends(serializers.response_layout),
+                           loader: loaders.BatchLoader = Depends(get_loader)):
+    payload = cache.get_or_load(
+        f"projects:{skip}:{limit}:{layout}", ["projects"],
+        lambda: serializers.list_payload("project", crud.get_projects(db, skip=skip, limit=limit), layout, loader),
+    )
+    return serializers.payload_response(payload, layout)
 
 @app.get("/projects/{project_id}", response_model=schemas.ProjectInDB)
-def read_project_endpoint(project_id: int, db: Session = Depends(get_db),
-                          current_user: models.User = Depends(auth.get_current_user)):
-    db_project = crud.get_project(db, project_id=project_id)
-    if db_project is None:
+def read_project_endpoint(project_id: int, current_user: models.User = Depends(auth.get_current_user),
+                          loader: loaders.BatchLoader = Depends(get_loader)):
+    project_data = get_cached_project(loader, project_id)
+    if project_data is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    return db_project
+    return serializers.FastJSONResponse(project_data)
 
 @app.put("/projects/{project_id}", response_model=schemas.ProjectInDB)
 def update_project_endpoint(project_id: int, project: schemas.ProjectCreate, db: Session = Depends(get_db),
@@ -104,60 +208,216 @@ def update_project_endpoint(project_id: int, project: schemas.ProjectCreate, db:
     return db_project
 
 @app.delete("/projects/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_project_endpoint(project_id: int, db: Session = Depends(get_db),
+def delete_project_endpoint(project_id: int, background: bool = False, db: Session = Depends(get_db),
                             current_user: models.User = Depends(auth.get_current_user)):
+    if background:
+        # Large projects: delete tasks in batches from a job instead of one long transaction
+        if not crud.get_project(db, project_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        return job_accepted(jobs.submit(db, "delete_project", {"project_id": project_id}, created_by=current_user.id))
     if not crud.delete_project(db, project_id):
         raise HTTPException(status_code=404, detail="Project not found")
     return {"message": "Project deleted successfully"}
 
+@app.post("/projects/counters/check", response_model=List[schemas.ProjectCounterDrift])
+def check_project_counters_endpoint(repair: bool = False, background: bool = False, db: Session = Depends(get_db),
+                                    current_user: models.User = Depends(auth.get_current_user)):
+    # Reports projects whose denormalized task counters drifted from the tasks table
+    if background:
+        return job_accepted(jobs.submit(db, "recompute_counters", {"repair": repair}, created_by=current_user.id))
+    return crud.check_project_counters(db, repair=repair)
+
+@app.post("/projects/{project_id}/export", response_model=schemas.JobInDB, status_code=status.HTTP_202_ACCEPTED)
+def export_project_tasks_endpoint(project_id: int, include_archived: bool = False, db: Session = Depends(get_db),
+                                  current_user: models.User = Depends(auth.get_current_user)):
+    # Always a job; the CSV is in the finished job's result
+    if not crud.get_project(db, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    params = {"project_id": project_id, "include_archived": include_archived}
+    return job_accepted(jobs.submit(db, "export_tasks", params, created_by=current_user.id))
+
+@app.post("/projects/{project_id}/tasks/import", response_model=schemas.JobInDB, status_code=status.HTTP_202_ACCEPTED)
+def import_project_tasks_endpoint(project_id: int, tasks: List[schemas.TaskImportRow], db: Session = Depends(get_db),
+                                  current_user: models.User = Depends(auth.get_current_user)):
+    if not crud.get_project(db, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    # Check all assignees up front with one query so the job can't fail halfway on a bad id
+    assignee_ids = {task.assigned_to for task in tasks if task.assigned_to is not None}
+    unknown_ids = assignee_ids - crud.get_existing_user_ids(db, assignee_ids)
+    if unknown_ids:
+        raise HTTPException(status_code=404, detail=f"Assigned users not found: {sorted(unknown_ids)}")
+    params = {"project_id": project_id, "tasks": tasks, "created_by": current_user.id}
+    return job_accepted(jobs.submit(db, "import_tasks", params, created_by=current_user.id))
+
 # Task Endpoints
 @app.post("/tasks/", response_model=schemas.TaskInDB, status_code=status.HTTP_201_CREATED)
 def create_task_endpoint(task: schemas.TaskCreate, db: Session = Depends(get_db),
-                         current_user: models.User = Depends(auth.get_current_user)):
+                         current_user: models.User = Depends(auth.get_current_user),
+                         loader: loaders.BatchLoader = Depends(get_loader)):
+    # One batch for the project, its creator and the assignee; they are reused for the response
+    loader.load(project_ids=[task.project_id], user_ids=[task.assigned_to])
     # Check if project exists
-    db_project = crud.get_project(db, task.project_id)
-    if not db_project:
+    if loader.project(task.project_id) is None:
         raise HTTPException(status_code=404, detail="Project not found")
     # Check if assigned_to user exists
-    if task.assigned_to and not crud.get_user(db, task.assigned_to):
+    if task.assigned_to and loader.user(task.assigned_to) is None:
         raise HTTPException(status_code=404, detail="Assigned user not found")
 
-    return crud.create_task(db=db, task=task, created_by_user_id=current_user.id)
+    db_task = crud.create_task(db=db, task=task, created_by_user_id=current_user.id)
+    loader.forget_projects([task.project_id]) # its counters just changed
+    return serializers.FastJSONResponse(serializers.item_payload("task", db_task, loader), status_code=status.HTTP_201_CREATED)
 
 @app.get("/tasks/", response_model=List[schemas.TaskInDB])
-def read_all_tasks_endpoint(skip: int = 0, limit: int = 100, db: Session = Depends(get_db),
-                            current_user: models.User = Depends(auth.get_current_user)):
-    tasks = crud.get_all_tasks(db, skip=skip, limit=limit)
-    return tasks
+def read_all_tasks_endpoint(skip: int = 0, limit: int = 100, include_archived: bool = False, db: Session = Depends(get_db),
+                            current_user: models.User = Depends(auth.get_current_user),
+                            layout: str = Depends(serializers.response_layout),
+                            loader: loaders.BatchLoader = Depends(get_loader)):
+    tasks = crud.get_all_tasks(db, skip=skip, limit=limit, include_archived=include_archived)
+    return serializers.tasks_response(tasks, layout, loader)
 
 @app.get("/tasks/project/{project_id}", response_model=List[schemas.TaskInDB])
-def read_tasks_by_project_endpoint(project_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db),
-                                   current_user: models.User = Depends(auth.get_current_user)):
-    db_project = crud.get_project(db, project_id=project_id)
-    if not db_project:
+def read_tasks_by_project_endpoint(project_id: int, skip: int = 0, limit: int = 100, include_archived: bool = False,
+                                   db: Session = Depends(get_db),
+                                   current_user: models.User = Depends(auth.get_current_user),
+                                   layout: str = Depends(serializers.response_layout),
+                                   loader: loaders.BatchLoader = Depends(get_loader)):
+    if get_cached_project(loader, project_id) is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    tasks = crud.get_tasks_by_project(db, project_id=project_id, skip=skip, limit=limit)
-    return tasks
+    payload = cache.get_or_load(
+        f"tasks:project:{project_id}:{skip}:{limit}:{include_archived}:{layout}", [f"project:{project_id}"],
+        lambda: serializers.list_payload("task", crud.get_tasks_by_project(
+            db, project_id=project_id, skip=skip, limit=limit, include_archived=include_archived), layout, loader),
+    )
+    return serializers.payload_response(payload, layout)
+
+# Declared before /tasks/{task_id} so "archived" isn't parsed as a task id
+@app.get("/tasks/archived", response_model=List[schemas.TaskInDB])
+def read_archived_tasks_endpoint(project_id: Optional[int] = None, skip: int = 0, limit: int = 100,
+                                 db: Session = Depends(get_db),
+                                 current_user: models.User = Depends(auth.get_current_user),
+                                 layout: str = Depends(serializers.response_layout),
+                                 loader: loaders.BatchLoader = Depends(get_loader)):
+    tasks = crud.get_archived_tasks(db, project_id=project_id, skip=skip, limit=limit)
+    return serializers.tasks_response(tasks, layout, loader)
 
 @app.get("/tasks/{task_id}", response_model=schemas.TaskInDB)
-def read_task_endpoint(task_id: int, db: Session = Depends(get_db),
-                       current_user: models.User = Depends(auth.get_current_user)):
+def read_task_endpoint(task_id: int, include_archived: bool = False, db: Session = Depends(get_db),
+                       current_user: models.User = Depends(auth.get_current_user),
+                       loader: loaders.BatchLoader = Depends(get_loader)):
     db_task = crud.get_task(db, task_id=task_id)
+    if db_task is None and include_archived:
+        db_task = crud.get_archived_task(db, task_id=task_id)
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    return db_task
+    return serializers.FastJSONResponse(serializers.item_payload("task", db_task, loader))
+
+@app.post("/tasks/batch", response_model=schemas.TaskBatchResult)
+def batch_update_tasks_endpoint(batch: schemas.TaskBatchUpdate, db: Session = Depends(get_db),
+                                current_user: models.User = Depends(auth.get_current_user)):
+    if len(batch.items) > 500:
+        raise HTTPException(status_code=400, detail="At most 500 updates per batch")
+    # Check every target project exists when moving tasks
+    target_project_ids = {item.changes.project_id for item in batch.items if item.changes.project_id is not None}
+    for project_id in target_project_ids:
+        if not crud.get_project(db, project_id):
+            raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
+    return crud.bulk_update_tasks(db, batch.items, changed_by=current_user.id)
 
 @app.put("/tasks/{task_id}", response_model=schemas.TaskInDB)
 def update_task_endpoint(task_id: int, task: schemas.TaskUpdate, db: Session = Depends(get_db),
-                         current_user: models.User = Depends(auth.get_current_user)):
-    db_task = crud.update_task(db, task_id, task)
+                         current_user: models.User = Depends(auth.get_current_user),
+                         loader: loaders.BatchLoader = Depends(get_loader)):
+    # Check the target project exists when moving the task
+    if task.project_id is not None and loader.project(task.project_id) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    db_task = crud.update_task(db, task_id, task, changed_by=current_user.id)
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    return db_task
+    # Counters of the task's project(s) may have changed; they are (re)loaded in one batch below
+    loader.forget_projects([task.project_id, db_task.project_id])
+    return serializers.FastJSONResponse(serializers.item_payload("task", db_task, loader))
 
 @app.delete("/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_task_endpoint(task_id: int, db: Session = Depends(get_db),
                          current_user: models.User = Depends(auth.get_current_user)):
-    if not crud.delete_task(db, task_id):
+    if not crud.delete_task(db, task_id, changed_by=current_user.id):
         raise HTTPException(status_code=404, detail="Task not found")
-    return {"message": "Task deleted successfully"}
\ No newline at end of file
+    return {"message": "Task deleted successfully"}
+
+# Job Endpoints
+@app.get("/jobs/", response_model=List[schemas.JobSummaryInDB])
+def read_jobs_endpoint(skip: int = 0, limit: int = 100, db: Session = Depends(get_db),
+                       current_user: models.User = Depends(auth.get_current_user)):
+    return jobs.get_jobs(db, created_by=current_user.id, skip=skip, limit=limit)
+
+def get_own_job(db: Session, job_id: int, current_user: models.User):
+    db_job = jobs.get_job(db, job_id)
+    if db_job is None or db_job.created_by != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return db_job
+
+@app.get("/jobs/{job_id}", response_model=schemas.JobInDB)
+def read_job_endpoint(job_id: int, db: Session = Depends(get_db),
+                      current_user: models.User = Depends(auth.get_current_user)):
+    return get_own_job(db, job_id, current_user)
+
+@app.post("/jobs/{job_id}/cancel", response_model=schemas.JobInDB)
+def cancel_job_endpoint(job_id: int, db: Session = Depends(get_db),
+                        current_user: models.User = Depends(auth.get_current_user)):
+    return jobs.cancel(db, get_own_job(db, job_id, current_user))
+
+# History Endpoints
+@app.get("/tasks/{task_id}/history", response_model=List[schemas.TaskHistoryInDB])
+def read_task_history_endpoint(task_id: int, skip: int = 0, limit: int = Query(100, ge=1, le=500),
+                               db: Session = Depends(get_db),
+                               current_user: models.User = Depends(auth.get_current_user)):
+    # History outlives the task, so a deleted or archived task still has readable history.
+    # Flush first so this worker's own recent changes are visible (read-your-writes).
+    history.buffer.flush()
+    return crud.get_task_history(db, task_id=task_id, skip=skip, limit=limit)
+
+@app.get("/projects/{project_id}/history", response_model=List[schemas.TaskHistoryInDB])
+def read_project_history_endpoint(project_id: int, skip: int = 0, limit: int = Query(100, ge=1, le=500),
+                                  db: Session = Depends(get_db),
+                                  current_user: models.User = Depends(auth.get_current_user)):
+    history.buffer.flush()
+    return crud.get_task_history(db, project_id=project_id, skip=skip, limit=limit)
+
+# Notifications
+@app.get("/users/me/notifications", response_model=List[schemas.NotificationInDB])
+def read_my_notifications_endpoint(unread_only: bool = False, skip: int = 0, limit: int = Query(50, ge=1, le=200),
+                                   db: Session = Depends(get_db),
+                                   current_user: models.User = Depends(auth.get_current_user)):
+    return crud.get_notifications(db, current_user.id, unread_only=unread_only, skip=skip, limit=limit)
+
+@app.post("/notifications/{notification_id}/read", response_model=schemas.NotificationInDB)
+def mark_notification_read_endpoint(notification_id: int, db: Session = Depends(get_db),
+                                    current_user: models.User = Depends(auth.get_current_user)):
+    db_notification = crud.mark_notification_read(db, notification_id, current_user.id)
+    if db_notification is None:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return db_notification
+
+# Cache Endpoint
+@app.get("/cache/stats")
+def read_cache_stats_endpoint(current_user: models.User = Depends(auth.get_current_user)):
+    # Hit rate, evictions and invalidations for this worker's view of the read cache
+    return cache.stats()
+
+# Search Endpoint
+@app.get("/search/", response_model=schemas.SearchResults)
+def search_endpoint(q: str = Query(..., min_length=1, max_length=200), kind: str = "all",
+                    skip: int = 0, limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_db),
+                    current_user: models.User = Depends(auth.get_current_user)):
+    if kind == "all":
+        kinds = search.SEARCH_KINDS
+    elif kind in search.SEARCH_KINDS:
+        kinds = (kind,)
+    else:
+        raise HTTPException(status_code=400, detail=f"kind must be one of: all, {', '.join(search.SEARCH_KINDS)}")
+    try:
+        results = search.search(db, q, kinds=kinds, skip=skip, limit=limit)
+    except NotImplementedError as e:
+        # Search needs the Postgres or SQLite indexes; other backends have none
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+    return {"query": q, "skip": skip, "limit": limit, "results": results}
\ No newline at end of file
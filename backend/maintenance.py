@@ -0,0 +1,56 @@
+# project_tracker_backend/maintenance.py
+# Operational commands, run from the repository root:
+#   python -m backend.maintenance check-counters [--repair] [--project-id ID ...]
+#   python -m backend.maintenance archive-tasks [--older-than-days N] [--batch-size N] [--max-batches N]
+#   python -m backend.maintenance send-reminders
+import argparse
+import sys
+
+from . import archive, crud, reminders
+from .database import SessionLocal
+
+def check_counters(project_ids=None, repair: bool = False):
+    db = SessionLocal()
+    try:
+        drifted = crud.check_project_counters(db, project_ids=project_ids, repair=repair)
+    finally:
+        db.close()
+    for drift in drifted:
+        print(f"Project {drift['project_id']}: stored={drift['stored']} actual={drift['actual']}")
+    if not drifted:
+        print("All project counters are consistent.")
+    elif repair:
+        print(f"Repaired {len(drifted)} project(s).")
+    return drifted
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Project Tracker maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    counters_parser = subparsers.add_parser("check-counters", help="Check denormalized project task counters for drift")
+    counters_parser.add_argument("--repair", action="store_true", help="Overwrite drifted counters with recomputed values")
+    counters_parser.add_argument("--project-id", type=int, action="append", dest="project_ids", help="Limit the check to these projects")
+
+    archive_parser = subparsers.add_parser("archive-tasks", help="Move long-completed tasks into the archive table")
+    archive_parser.add_argument("--older-than-days", type=int, default=archive.ARCHIVE_AFTER_DAYS)
+    archive_parser.add_argument("--batch-size", type=int, default=archive.ARCHIVE_BATCH_SIZE)
+    archive_parser.add_argument("--max-batches", type=int, default=None)
+
+    subparsers.add_parser("send-reminders", help="Send today's due-date reminders once (for REMINDERS_ENABLED=false deployments)")
+
+    args = parser.parse_args(argv)
+    if args.command == "check-counters":
+        drifted = check_counters(project_ids=args.project_ids, repair=args.repair)
+        # Non-zero exit on unrepaired drift so the check can gate a cron job or CI step
+        return 1 if drifted and not args.repair else 0
+    if args.command == "archive-tasks":
+        archived = archive.run_archival_pass(older_than_days=args.older_than_days, batch_size=args.batch_size,
+                                             max_batches=args.max_batches)
+        print(f"Archived {archived} task(s).")
+    if args.command == "send-reminders":
+        events = reminders.run_tick()
+        print(f"Sent {len(events)} reminder(s).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+# project_tracker_backend/migrations/env.py
+from logging.config import fileConfig
+
+from alembic import context
+
+from backend import models # noqa: F401 - registers every table on Base.metadata
+from backend.database import Base, engine
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Search objects created with raw DDL by 0002 (see search.py) that have no model: SQLite FTS5
+# tables (plus their shadow tables, e.g. tasks_fts_data) and Postgres expression/trigram
+# indexes. Without this filter --autogenerate would emit drops for them.
+UNMANAGED_TABLE_PREFIXES = ("tasks_fts", "projects_fts")
+UNMANAGED_INDEXES = {
+    "ix_tasks_search_tsv", "ix_tasks_title_trgm", "ix_tasks_description_trgm",
+    "ix_projects_search_tsv", "ix_projects_name_trgm",
+}
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and name.startswith(UNMANAGED_TABLE_PREFIXES):
+        return False
+    if type_ == "index" and name in UNMANAGED_INDEXES:
+        return False
+    return True
+
+def run_migrations_offline():
+    # `alembic upgrade head --sql` renders the DDL without connecting
+    context.configure(url=str(engine.url), target_metadata=target_metadata, literal_binds=True,
+                      include_object=include_object, render_as_batch=engine.dialect.name == "sqlite")
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        # SQLite can't ALTER most things in place; batch mode recreates the table instead
+        context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object,
+                          render_as_batch=connection.dialect.name == "sqlite")
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
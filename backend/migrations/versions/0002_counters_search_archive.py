@@ -0,0 +1,115 @@
+"""Project task counters, My Tasks and archival indexes, archived_tasks, search indexes
+
+Revision ID: 0002_counters_search_archive
+Revises: 0001_baseline
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_counters_search_archive"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+# Frozen copies of models.STATUS_COUNTER_COLUMNS and search.TASK_TSV / PROJECT_TSV
+STATUS_COUNTER_COLUMNS = {
+    "To Do": "todo_count",
+    "In Progress": "in_progress_count",
+    "Done": "done_count",
+    "Blocked": "blocked_count",
+}
+TASK_TSV = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
+PROJECT_TSV = "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, ''))"
+
+
+def _sqlite_fts(table, fts_table, columns):
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {fts_table} USING fts5({column_list}, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER {fts_table}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER {fts_table}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END",
+        # Only text edits reindex; status moves on the board don't touch the FTS table
+        f"CREATE TRIGGER {fts_table}_au AFTER UPDATE OF {column_list} ON {table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+        # Index rows that existed before the FTS table was created
+        f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')",
+    ]
+
+
+def upgrade():
+    # Denormalized per-project task counters, backfilled from the existing tasks
+    counter_columns = ["task_count"] + list(STATUS_COUNTER_COLUMNS.values())
+    for column in counter_columns:
+        op.add_column("projects", sa.Column(column, sa.Integer(), server_default="0", nullable=False))
+    op.execute("UPDATE projects SET task_count = (SELECT count(*) FROM tasks WHERE tasks.project_id = projects.id)")
+    for status, column in STATUS_COUNTER_COLUMNS.items():
+        op.execute(
+            f"UPDATE projects SET {column} = "
+            f"(SELECT count(*) FROM tasks WHERE tasks.project_id = projects.id AND tasks.status = '{status}')"
+        )
+
+    # /users/me/tasks
+    op.create_index("ix_tasks_assigned_to_status_due_date", "tasks", ["assigned_to", "status", "due_date"])
+
+    # Hot/cold archival
+    op.add_column("tasks", sa.Column("completed_at", sa.DateTime()))
+    op.create_index("ix_tasks_status_completed_at", "tasks", ["status", "completed_at"])
+    op.create_table(
+        "archived_tasks",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("due_date", sa.Date()),
+        sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("assigned_to", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL")),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("completed_at", sa.DateTime()),
+        sa.Column("archived_at", sa.DateTime()),
+    )
+    op.create_index("ix_archived_tasks_project_id", "archived_tasks", ["project_id"])
+
+    # Full-text + fuzzy search
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(f"CREATE INDEX ix_tasks_search_tsv ON tasks USING gin (({TASK_TSV}))")
+        op.execute("CREATE INDEX ix_tasks_title_trgm ON tasks USING gin (title gin_trgm_ops)")
+        op.execute("CREATE INDEX ix_tasks_description_trgm ON tasks USING gin (description gin_trgm_ops)")
+        op.execute(f"CREATE INDEX ix_projects_search_tsv ON projects USING gin (({PROJECT_TSV}))")
+        op.execute("CREATE INDEX ix_projects_name_trgm ON projects USING gin (name gin_trgm_ops)")
+    elif dialect == "sqlite":
+        for statement in _sqlite_fts("tasks", "tasks_fts", ["title", "description"]) + \
+                _sqlite_fts("projects", "projects_fts", ["name", "description"]):
+            op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        for index in ("ix_projects_name_trgm", "ix_projects_search_tsv", "ix_tasks_description_trgm",
+                      "ix_tasks_title_trgm", "ix_tasks_search_tsv"):
+            op.execute(f"DROP INDEX IF EXISTS {index}")
+    elif dialect == "sqlite":
+        for table in ("tasks", "projects"):
+            for suffix in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
+
+    op.drop_index("ix_archived_tasks_project_id", table_name="archived_tasks")
+    op.drop_table("archived_tasks")
+    op.drop_index("ix_tasks_status_completed_at", table_name="tasks")
+    op.drop_index("ix_tasks_assigned_to_status_due_date", table_name="tasks")
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.drop_column("completed_at")
+    with op.batch_alter_table("projects") as batch_op:
+        for column in ["task_count"] + list(STATUS_COUNTER_COLUMNS.values()):
+            batch_op.drop_column(column)
@@ -0,0 +1,36 @@
+"""Append-only task change history
+
+Revision ID: 0003_task_history
+Revises: 0002_counters_search_archive
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_task_history"
+down_revision = "0002_counters_search_archive"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "task_history",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("field", sa.String(), nullable=False),
+        sa.Column("old_value", sa.Text()),
+        sa.Column("new_value", sa.Text()),
+        sa.Column("changed_by", sa.Integer()),
+        sa.Column("changed_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_task_history_task_id_changed_at", "task_history", ["task_id", "changed_at"])
+    op.create_index("ix_task_history_project_id_changed_at", "task_history", ["project_id", "changed_at"])
+
+
+def downgrade():
+    op.drop_index("ix_task_history_project_id_changed_at", table_name="task_history")
+    op.drop_index("ix_task_history_task_id_changed_at", table_name="task_history")
+    op.drop_table("task_history")
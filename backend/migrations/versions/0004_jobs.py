@@ -0,0 +1,43 @@
+"""Background jobs
+
+Revision ID: 0004_jobs
+Revises: 0003_task_history
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_jobs"
+down_revision = "0003_task_history"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("params", sa.Text()),
+        sa.Column("result", sa.Text()),
+        sa.Column("error", sa.Text()),
+        sa.Column("progress", sa.Float(), nullable=False),
+        sa.Column("done", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Integer()),
+        sa.Column("message", sa.String()),
+        sa.Column("cancel_requested", sa.Boolean(), nullable=False),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL")),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+    )
+    op.create_index("ix_jobs_id", "jobs", ["id"])
+    op.create_index("ix_jobs_created_by_created_at", "jobs", ["created_by", "created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_jobs_created_by_created_at", table_name="jobs")
+    op.drop_index("ix_jobs_id", table_name="jobs")
+    op.drop_table("jobs")
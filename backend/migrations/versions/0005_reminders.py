@@ -0,0 +1,39 @@
+"""Due-date reminders: tasks.due_date index and in-app notifications
+
+Revision ID: 0005_reminders
+Revises: 0004_jobs
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_reminders"
+down_revision = "0004_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_tasks_due_date", "tasks", ["due_date"])
+    op.create_table(
+        "notifications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("due_date", sa.Date(), nullable=False),
+        sa.Column("message", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("read_at", sa.DateTime()),
+    )
+    op.create_index("ix_notifications_user_id_created_at", "notifications", ["user_id", "created_at"])
+    op.create_index("uq_notifications_task_id_kind_due_date", "notifications", ["task_id", "kind", "due_date"], unique=True)
+
+
+def downgrade():
+    op.drop_index("uq_notifications_task_id_kind_due_date", table_name="notifications")
+    op.drop_index("ix_notifications_user_id_created_at", table_name="notifications")
+    op.drop_table("notifications")
+    op.drop_index("ix_tasks_due_date", table_name="tasks")
@@ -0,0 +1,27 @@
+"""Job ownership leases
+
+Revision ID: 0006_job_leases
+Revises: 0005_reminders
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006_job_leases"
+down_revision = "0005_reminders"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("jobs", sa.Column("worker_id", sa.String()))
+    op.add_column("jobs", sa.Column("heartbeat_at", sa.DateTime()))
+    op.create_index("ix_jobs_status_heartbeat_at", "jobs", ["status", "heartbeat_at"])
+
+
+def downgrade():
+    op.drop_index("ix_jobs_status_heartbeat_at", table_name="jobs")
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.drop_column("heartbeat_at")
+        batch_op.drop_column("worker_id")
@@ -1,9 +1,19 @@
 # project_tracker_backend/models.py
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey
+import json
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Float, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
 
+# Maps task statuses to the denormalized counter columns kept on Project.
+# Statuses not listed here are still reflected in Project.task_count.
+STATUS_COUNTER_COLUMNS = {
+    "To Do": "todo_count",
+    "In Progress": "in_progress_count",
+    "Done": "done_count",
+    "Blocked": "blocked_count",
+}
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
@@ -23,9 +33,18 @@ class Project(Base):
     description = Column(Text)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=func.now())
+    # Denormalized task counters, maintained by crud on every task write so project
+    # lists never have to touch the tasks table. See crud.check_project_counters for repair.
+    task_count = Column(Integer, default=0, server_default="0", nullable=False)
+    todo_count = Column(Integer, default=0, server_default="0", nullable=False)
+    in_progress_count = Column(Integer, default=0, server_default="0", nullable=False)
+    done_count = Column(Integer, default=0, server_default="0", nullable=False)
+    blocked_count = Column(Integer, default=0, server_default="0", nullable=False)
 
     creator = relationship("User", back_populates="projects")
     tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan") # cascade for deleting tasks with project
+    # Archived rows are removed by the database-level ON DELETE CASCADE, without loading them
+    archived_tasks = relationship("ArchivedTask", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
 
 class Task(Base):
     __tablename__ = "tasks"
@@ -38,7 +57,110 @@ class Task(Base):
     assigned_to = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=func.now())
+    completed_at = Column(DateTime) # Set by crud when the task enters "Done", cleared when it leaves
 
     project = relationship("Project", back_populates="tasks")
     assignee = relationship("User", foreign_keys="[Task.assigned_to]", back_populates="assigned_tasks")
-    creator = relationship("User", foreign_keys="[Task.created_by]", back_populates="created_tasks")
\ No newline at end of file
+    creator = relationship("User", foreign_keys="[Task.created_by]", back_populates="created_tasks")
+
+    __table_args__ = (
+        # Serves /users/me/tasks: equality on assignee (+ status), range/sort on due_date
+        Index("ix_tasks_assigned_to_status_due_date", "assigned_to", "status", "due_date"),
+        # Serves the archival scan for long-completed tasks
+        Index("ix_tasks_status_completed_at", "status", "completed_at"),
+        # Serves the reminder scheduler's due-date window scan (see reminders.py)
+        Index("ix_tasks_due_date", "due_date"),
+    )
+
+class TaskHistory(Base):
+    # Append-only field-level change log, written in batches by history.py. No foreign keys:
+    # history outlives deleted and archived tasks.
+    __tablename__ = "task_history"
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, nullable=False)
+    project_id = Column(Integer, nullable=False)
+    field = Column(String, nullable=False) # a task column, or "created" / "deleted"
+    old_value = Column(Text)
+    new_value = Column(Text)
+    changed_by = Column(Integer)
+    changed_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_task_history_task_id_changed_at", "task_id", "changed_at"),
+        Index("ix_task_history_project_id_changed_at", "project_id", "changed_at"),
+    )
+
+class ArchivedTask(Base):
+    # Cold storage for tasks that have been "Done" longer than archive.ARCHIVE_AFTER_DAYS.
+    # Same columns as Task (ids are preserved) so TaskInDB serializes either.
+    __tablename__ = "archived_tasks"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String, nullable=False)
+    description = Column(Text)
+    status = Column(String, nullable=False)
+    due_date = Column(Date)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), index=True, nullable=False)
+    assigned_to = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    archived_at = Column(DateTime, default=func.now())
+
+    project = relationship("Project", back_populates="archived_tasks")
+    assignee = relationship("User", foreign_keys="[ArchivedTask.assigned_to]")
+    creator = relationship("User", foreign_keys="[ArchivedTask.created_by]")
+
+class Job(Base):
+    # Background jobs run by jobs.py; rows are polled through GET /jobs/{id}
+    __tablename__ = "jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False) # a key of jobs.HANDLERS
+    status = Column(String, default="queued", nullable=False) # queued, running, succeeded, failed, cancelled
+    params_json = Column("params", Text)
+    result_json = Column("result", Text)
+    error = Column(Text)
+    progress = Column(Float, default=0.0, nullable=False) # 0.0 - 1.0
+    done = Column(Integer, default=0, nullable=False)
+    total = Column(Integer)
+    message = Column(String)
+    cancel_requested = Column(Boolean, default=False, nullable=False)
+    worker_id = Column(String) # jobs.WORKER_ID of the process that owns the job
+    heartbeat_at = Column(DateTime) # lease, renewed by the owner; see jobs.fail_abandoned
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    created_at = Column(DateTime, default=func.now())
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_jobs_created_by_created_at", "created_by", "created_at"),
+        # Serves the lease scan for abandoned jobs
+        Index("ix_jobs_status_heartbeat_at", "status", "heartbeat_at"),
+    )
+
+    @property
+    def params(self):
+        return json.loads(self.params_json) if self.params_json else {}
+
+    @property
+    def result(self):
+        return json.loads(self.result_json) if self.result_json else None
+
+class Notification(Base):
+    # In-app due-date reminders written by reminders.TableSink. No foreign keys, like task_history:
+    # a notification outlives the task it is about.
+    __tablename__ = "notifications"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    task_id = Column(Integer, nullable=False)
+    project_id = Column(Integer, nullable=False)
+    kind = Column(String, nullable=False) # "due_soon" or "overdue"
+    due_date = Column(Date, nullable=False)
+    message = Column(String, nullable=False)
+    created_at = Column(DateTime, default=func.now())
+    read_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_notifications_user_id_created_at", "user_id", "created_at"),
+        # One reminder of each kind per task and due date, even if the scheduler fires twice
+        Index("uq_notifications_task_id_kind_due_date", "task_id", "kind", "due_date", unique=True),
+    )
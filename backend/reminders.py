@@ -0,0 +1,306 @@
+# project_tracker_backend/reminders.py
+# Due-date reminders. The scheduler keeps a min-heap of upcoming reminder dates for open tasks
+# due within REMINDER_HORIZON_DAYS. The heap is loaded with one range scan over ix_tasks_due_date
+# and kept current by the crud task mutations (track / forget). Each tick only pops the entries
+# that are due, so its cost follows the number of reminders to send, not the size of `tasks`.
+#
+# Two kinds of event:
+#   due_soon  on due_date - REMINDER_DUE_SOON_DAYS
+#   overdue   on due_date + 1 day, if the task still isn't "Done"
+#
+# Events go to the configured sinks (REMINDER_SINKS): log, webhook and/or the in-app
+# `notifications` table. Every worker runs the loop, but only the one holding the scheduler
+# lock (a Postgres session advisory lock; see LeaderLock) keeps a heap and sends reminders, so
+# each is sent once. If that worker dies, its connection closes and another worker takes over
+# on its next tick. Changes made in other workers reach the leader through the window reload
+# every REMINDER_RELOAD_SECONDS, and every event is re-checked against the database right
+# before delivery.
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+REMINDERS_ENABLED = os.getenv("REMINDERS_ENABLED", "true").lower() in ("1", "true", "yes")
+REMINDER_TICK_SECONDS = int(os.getenv("REMINDER_TICK_SECONDS", "60"))
+REMINDER_DUE_SOON_DAYS = int(os.getenv("REMINDER_DUE_SOON_DAYS", "1"))
+REMINDER_HORIZON_DAYS = int(os.getenv("REMINDER_HORIZON_DAYS", "7")) # how far ahead the heap reaches
+REMINDER_RELOAD_SECONDS = int(os.getenv("REMINDER_RELOAD_SECONDS", "300")) # picks up other workers' changes
+REMINDER_LOCK_KEY = 7_140_001 # advisory lock id of the scheduler; any constant unique to this app
+REMINDER_SINKS = [name.strip() for name in os.getenv("REMINDER_SINKS", "log,table").split(",") if name.strip()]
+REMINDER_WEBHOOK_URL = os.getenv("REMINDER_WEBHOOK_URL", "")
+
+DUE_SOON = "due_soon"
+OVERDUE = "overdue"
+
+def _fire_on(kind: str, due_date: date):
+    if kind == DUE_SOON:
+        return due_date - timedelta(days=REMINDER_DUE_SOON_DAYS)
+    return due_date + timedelta(days=1)
+
+def _is_open(status: str, due_date):
+    return due_date is not None and status != "Done"
+
+def _message(event):
+    if event["kind"] == DUE_SOON:
+        return f"\"{event['title']}\" is due on {event['due_date'].isoformat()}"
+    return f"\"{event['title']}\" was due on {event['due_date'].isoformat()} and is not done"
+
+# Sinks receive a list of events (dicts with kind, task_id, project_id, title, due_date, user_id)
+class LogSink:
+    def deliver(self, events):
+        for event in events:
+            logger.info("Reminder (%s) for task %d: %s", event["kind"], event["task_id"], _message(event))
+
+class WebhookSink:
+    # POSTs the batch as JSON to REMINDER_WEBHOOK_URL; without a URL it only logs what it would send
+    def __init__(self, url: str = REMINDER_WEBHOOK_URL, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def deliver(self, events):
+        body = json.dumps({"reminders": [
+            dict(event, due_date=event["due_date"].isoformat(), message=_message(event)) for event in events
+        ]}).encode()
+        if not self.url:
+            logger.info("Reminder webhook not configured; would POST %d reminder(s)", len(events))
+            return
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+class TableSink:
+    # In-app notifications for the assignee (or the creator of an unassigned task). Reminders
+    # already in the table are skipped; the unique index settles races with another scheduler.
+    @staticmethod
+    def _notification(event):
+        return models.Notification(
+            user_id=event["user_id"], task_id=event["task_id"], project_id=event["project_id"],
+            kind=event["kind"], due_date=event["due_date"], message=_message(event),
+        )
+
+    def deliver(self, events):
+        db = SessionLocal()
+        try:
+            keys = {(event["task_id"], event["kind"], event["due_date"]) for event in events}
+            existing = {
+                (task_id, kind, due_date) for task_id, kind, due_date in db.query(
+                    models.Notification.task_id, models.Notification.kind, models.Notification.due_date,
+                ).filter(models.Notification.task_id.in_({task_id for task_id, _, _ in keys}))
+            }
+            new_events = [
+                event for event in events if (event["task_id"], event["kind"], event["due_date"]) not in existing
+            ]
+            db.add_all(self._notification(event) for event in new_events)
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another scheduler inserted some of these meanwhile: insert one by one so only
+                # the duplicates are dropped, not the whole batch
+                db.rollback()
+                for event in new_events:
+                    db.add(self._notification(event))
+                    try:
+                        db.commit()
+                    except IntegrityError:
+                        db.rollback()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+SINKS = {"log": LogSink, "webhook": WebhookSink, "table": TableSink}
+
+class ReminderScheduler:
+    def __init__(self, sinks=None, horizon_days: int = REMINDER_HORIZON_DAYS):
+        self.sinks = sinks if sinks is not None else [SINKS[name]() for name in REMINDER_SINKS]
+        self.horizon_days = horizon_days
+        self.today = None # None until the first load; track/forget are no-ops before that
+        self._heap = [] # (fire_on, task_id, kind, due_date)
+        self._scheduled = set() # (task_id, kind, due_date) currently in the heap
+        self._fired = set() # keys popped today, so a later edit or reload doesn't schedule them again
+        self._fired_on = None # the day _fired is about
+        self._loaded_at = None # time.monotonic() of the last load
+        self._due_dates = {} # task_id -> due_date of each tracked open task
+        self._lock = threading.Lock() # crud calls track/forget from FastAPI's threadpool
+
+    def __len__(self):
+        return len(self._due_dates)
+
+    def _window(self):
+        # Due dates whose overdue or due-soon reminder may fire between today and the horizon
+        return self.today - timedelta(days=1), self.today + timedelta(days=self.horizon_days)
+
+    def _schedule(self, task_id: int, due_date: date):
+        # Reminders whose date already passed are not sent late: a task created or moved to a
+        # date inside the due-soon period only gets its overdue reminder
+        self._due_dates[task_id] = due_date
+        for kind in (DUE_SOON, OVERDUE):
+            fire_on = _fire_on(kind, due_date)
+            key = (task_id, kind, due_date)
+            if fire_on >= self.today and key not in self._scheduled and key not in self._fired:
+                self._scheduled.add(key)
+                heapq.heappush(self._heap, (fire_on, task_id, kind, due_date))
+
+    def load(self, db: Session, today: date = None):
+        # Rebuilds the heap from one indexed range scan over the horizon window. Reminders
+        # already sent today stay sent.
+        today = today or date.today()
+        with self._lock:
+            self.today = today
+            self._loaded_at = time.monotonic()
+            if self._fired_on != today:
+                self._fired, self._fired_on = set(), today
+            window_start, window_end = self._window()
+            rows = (
+                db.query(models.Task.id, models.Task.due_date)
+                .filter(models.Task.due_date >= window_start, models.Task.due_date <= window_end,
+                        models.Task.status != "Done")
+                .all()
+            )
+            self._heap, self._scheduled, self._due_dates = [], set(), {}
+            for task_id, due_date in rows:
+                self._schedule(task_id, due_date)
+        return len(rows)
+
+    def track(self, task_id: int, status: str, due_date):
+        # Called by crud after a task was created or updated (and committed)
+        with self._lock:
+            if self.today is None:
+                return
+            self._due_dates.pop(task_id, None)
+            window_start, window_end = self._window()
+            if _is_open(status, due_date) and window_start <= due_date <= window_end:
+                self._schedule(task_id, due_date)
+
+    def stop(self):
+        # Lost (or never had) the scheduler lock: stop tracking until the next load
+        with self._lock:
+            self.today = None
+            self._heap, self._scheduled, self._due_dates = [], set(), {}
+
+    def forget(self, task_id: int):
+        # Called by crud after a task was deleted; its heap entries are dropped lazily when popped
+        with self._lock:
+            self._due_dates.pop(task_id, None)
+
+    def pop_due(self, today: date):
+        # Entries due by `today` whose task is still tracked with the same due date
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= today:
+                _, task_id, kind, due_date = heapq.heappop(self._heap)
+                self._scheduled.discard((task_id, kind, due_date))
+                self._fired.add((task_id, kind, due_date))
+                if self._due_dates.get(task_id) == due_date:
+                    due.append((task_id, kind, due_date))
+        return due
+
+    def tick(self, db: Session, today: date = None):
+        # Returns the events delivered. At a date rollover, and every REMINDER_RELOAD_SECONDS,
+        # the window is reloaded first.
+        today = today or date.today()
+        if self.today != today or time.monotonic() - self._loaded_at >= REMINDER_RELOAD_SECONDS:
+            self.load(db, today)
+        due = self.pop_due(today)
+        if not due:
+            return []
+        # Re-check against the database: the task may have changed in another worker
+        current = {
+            row.id: row for row in db.query(
+                models.Task.id, models.Task.project_id, models.Task.title, models.Task.status,
+                models.Task.due_date, models.Task.assigned_to, models.Task.created_by,
+            ).filter(models.Task.id.in_({task_id for task_id, _, _ in due}))
+        }
+        events = []
+        for task_id, kind, due_date in due:
+            row = current.get(task_id)
+            if row is None or not _is_open(row.status, row.due_date) or row.due_date != due_date:
+                continue
+            events.append({
+                "kind": kind,
+                "task_id": task_id,
+                "project_id": row.project_id,
+                "title": row.title,
+                "due_date": due_date,
+                "user_id": row.assigned_to or row.created_by,
+            })
+        db.rollback() # end the read transaction before talking to the sinks
+        if events:
+            for sink in self.sinks:
+                try:
+                    sink.deliver(events)
+                except Exception:
+                    logger.exception("Reminder sink %s failed for %d event(s)", type(sink).__name__, len(events))
+        return events
+
+class LeaderLock:
+    # Session-level advisory lock held on a dedicated connection for as long as this worker
+    # schedules reminders. Postgres releases it when the connection goes away, which lets
+    # another worker take over. Other databases (SQLite for local runs) have one process.
+    def __init__(self, key: int = REMINDER_LOCK_KEY):
+        self.key = key
+        self._connection = None
+
+    def acquire(self):
+        if engine.dialect.name != "postgresql":
+            return True
+        if self._connection is not None:
+            try:
+                self._connection.execute(text("SELECT 1"))
+                return True
+            except Exception:
+                logger.warning("Lost the reminder scheduler lock connection")
+                self.release()
+        connection = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+        except Exception:
+            connection.invalidate()
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def release(self):
+        if self._connection is None:
+            return
+        connection, self._connection = self._connection, None
+        # Discard rather than return it to the pool, so the session (and the lock) really ends
+        connection.invalidate()
+        connection.close()
+
+scheduler = ReminderScheduler()
+leader = LeaderLock()
+
+def track(task_id: int, status: str, due_date):
+    scheduler.track(task_id, status, due_date)
+
+def forget(task_id: int):
+    scheduler.forget(task_id)
+
+def run_tick():
+    if not leader.acquire():
+        scheduler.stop()
+        return []
+    db = SessionLocal()
+    try:
+        return scheduler.tick(db)
+    finally:
+        db.close()
@@ -1,6 +1,6 @@
 # project_tracker_backend/schemas.py
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, validator
+from typing import Optional, List, Dict, Any
 from datetime import date, datetime
 
 # Base Schemas (for creating/updating)
@@ -31,6 +31,34 @@ class TaskUpdate(BaseModel):
     status: Optional[str] = None
     due_date: Optional[date] = None
     assigned_to: Optional[int] = None # Can be set to null by passing None
+    project_id: Optional[int] = None # Moves the task to another project
+
+    # These may be left out, but not cleared: the columns are NOT NULL
+    @validator("title", pre=True)
+    def title_not_null(cls, value):
+        if value is None:
+            raise ValueError("title may be omitted but not null")
+        return value
+
+    @validator("status", pre=True)
+    def status_not_null(cls, value):
+        if value is None:
+            raise ValueError("status may be omitted but not null")
+        return value
+
+    @validator("project_id", pre=True)
+    def project_id_not_null(cls, value):
+        if value is None:
+            raise ValueError("project_id may be omitted but not null")
+        return value
+
+class TaskImportRow(BaseModel):
+    # One row of POST /projects/{project_id}/tasks/import; the project comes from the path
+    title: str
+    description: Optional[str] = None
+    status: str = "To Do"
+    due_date: Optional[date] = None
+    assigned_to: Optional[int] = None
 
 # Response Schemas (for returning data)
 class UserInDB(BaseModel):
@@ -48,6 +76,12 @@ class ProjectInDB(BaseModel):
     description: Optional[str]
     created_by: int
     created_at: datetime
+    # Denormalized task counters (see models.STATUS_COUNTER_COLUMNS)
+    task_count: int = 0
+    todo_count: int = 0
+    in_progress_count: int = 0
+    done_count: int = 0
+    blocked_count: int = 0
     # Nested Pydantic model for creator details. Make sure UserInDB has orm_mode = True
     creator: UserInDB
 
@@ -64,6 +98,8 @@ class TaskInDB(BaseModel):
     assigned_to: Optional[int]
     created_by: int
     created_at: datetime
+    completed_at: Optional[datetime] = None
+    archived_at: Optional[datetime] = None # Only set for tasks served from the archive
     # Nested Pydantic models for related objects
     project: ProjectInDB
     assignee: Optional[UserInDB]
@@ -72,10 +108,108 @@ class TaskInDB(BaseModel):
     class Config:
         orm_mode = True
 
+class TaskHistoryInDB(BaseModel):
+    id: int
+    task_id: int
+    project_id: int
+    field: str # a task field, or "created" / "deleted"
+    old_value: Optional[str]
+    new_value: Optional[str]
+    changed_by: Optional[int]
+    changed_at: datetime
+
+    class Config:
+        orm_mode = True
+
+# In-app due-date reminders (see reminders.TableSink)
+class NotificationInDB(BaseModel):
+    id: int
+    task_id: int
+    project_id: int
+    kind: str # "due_soon" or "overdue"
+    due_date: date
+    message: str
+    created_at: datetime
+    read_at: Optional[datetime]
+
+    class Config:
+        orm_mode = True
+
+# Batched task updates (see crud.bulk_update_tasks)
+class TaskBatchItem(BaseModel):
+    id: int
+    changes: TaskUpdate
+    # Last values the client saw for the fields it changes; a mismatch is reported as a conflict
+    base: Optional[Dict[str, Any]] = None
+
+class TaskBatchUpdate(BaseModel):
+    items: List[TaskBatchItem]
+
+class TaskBatchConflict(BaseModel):
+    id: int
+    fields: Dict[str, Dict[str, Any]] # field -> {"expected": ..., "actual": ...}
+    current: TaskInDB
+
+class TaskBatchResult(BaseModel):
+    updated: List[TaskInDB]
+    conflicts: List[TaskBatchConflict]
+    missing: List[int]
+
+# Background jobs (see jobs.py)
+class JobSummaryInDB(BaseModel):
+    # Job listing: everything but params and result, which can be large (an import's rows, a CSV export)
+    id: int
+    kind: str
+    status: str # queued, running, succeeded, failed, cancelled
+    progress: float
+    done: int
+    total: Optional[int]
+    message: Optional[str]
+    error: Optional[str]
+    cancel_requested: bool
+    created_by: Optional[int]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        orm_mode = True
+
+class JobInDB(JobSummaryInDB):
+    params: Dict[str, Any]
+    result: Optional[Any]
+
 # Token schema for authentication
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None # access token lifetime, in seconds
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
-    username: Optional[str] = None
\ No newline at end of file
+    username: Optional[str] = None
+
+# Search results (see search.search)
+class SearchHit(BaseModel):
+    kind: str # "task" or "project"
+    id: int
+    project_id: int
+    title: str
+    highlight: str # title/name with <mark> around matched terms
+    snippet: Optional[str] = None # highlighted description fragment
+    rank: float
+
+class SearchResults(BaseModel):
+    query: str
+    skip: int
+    limit: int
+    results: List[SearchHit]
+
+# Counter consistency report (see crud.check_project_counters)
+class ProjectCounterDrift(BaseModel):
+    project_id: int
+    stored: Dict[str, int]
+    actual: Dict[str, int]
\ No newline at end of file
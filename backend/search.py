@@ -0,0 +1,112 @@
+# project_tracker_backend/search.py
+# Ranked full-text + fuzzy search over tasks and projects.
+# PostgreSQL: tsvector expression indexes (GIN) for full-text plus pg_trgm GIN indexes for
+# fuzzy/substring matching on task titles and descriptions and project names. SQLite (local
+# testing): FTS5 external-content tables kept in sync with triggers. The indexes, FTS tables
+# and triggers are created by the 0002 migration in backend/migrations/versions.
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+SEARCH_CONFIG = "english"
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+SEARCH_KINDS = ("task", "project")
+
+# These expressions must match the migration's index definitions exactly for Postgres to use the indexes
+TASK_TSV = f"to_tsvector('{SEARCH_CONFIG}', coalesce(title, '') || ' ' || coalesce(description, ''))"
+PROJECT_TSV = f"to_tsvector('{SEARCH_CONFIG}', coalesce(name, '') || ' ' || coalesce(description, ''))"
+
+# --- PostgreSQL queries ---
+# websearch_to_tsquery accepts raw user input ("quoted phrases", -exclusions, or) without syntax errors.
+# Rows match either the full-text index or the trigram indexes (word_similarity via <%), and rank
+# combines them so typos still surface near the top; description matches weigh half a title match.
+POSTGRES_TASK_QUERY = f"""
+SELECT id, project_id, title,
+       ts_headline('{SEARCH_CONFIG}', title, q, 'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, HighlightAll=true') AS highlight,
+       ts_headline('{SEARCH_CONFIG}', coalesce(description, ''), q, 'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=1, MaxWords=20, MinWords=5') AS snippet,
+       ts_rank_cd({TASK_TSV}, q) + word_similarity(:term, title)
+           + 0.5 * word_similarity(:term, coalesce(description, '')) AS rank
+FROM tasks, websearch_to_tsquery('{SEARCH_CONFIG}', :term) AS q
+WHERE {TASK_TSV} @@ q OR :term <% title OR :term <% description
+ORDER BY rank DESC, id
+LIMIT :limit OFFSET :skip
+"""
+
+POSTGRES_PROJECT_QUERY = f"""
+SELECT id, id AS project_id, name AS title,
+       ts_headline('{SEARCH_CONFIG}', name, q, 'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, HighlightAll=true') AS highlight,
+       ts_headline('{SEARCH_CONFIG}', coalesce(description, ''), q, 'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=1, MaxWords=20, MinWords=5') AS snippet,
+       ts_rank_cd({PROJECT_TSV}, q) + word_similarity(:term, name) AS rank
+FROM projects, websearch_to_tsquery('{SEARCH_CONFIG}', :term) AS q
+WHERE {PROJECT_TSV} @@ q OR :term <% name
+ORDER BY rank DESC, id
+LIMIT :limit OFFSET :skip
+"""
+
+# --- SQLite FTS5 queries ---
+# bm25() is lower-is-better, so it is negated to keep "higher rank is better" across backends.
+SQLITE_TASK_QUERY = f"""
+SELECT tasks.id AS id, tasks.project_id AS project_id, tasks.title AS title,
+       highlight(tasks_fts, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_STOP}') AS highlight,
+       snippet(tasks_fts, 1, '{HIGHLIGHT_START}', '{HIGHLIGHT_STOP}', '…', 20) AS snippet,
+       -bm25(tasks_fts) AS rank
+FROM tasks_fts JOIN tasks ON tasks.id = tasks_fts.rowid
+WHERE tasks_fts MATCH :term
+ORDER BY rank DESC, tasks.id
+LIMIT :limit OFFSET :skip
+"""
+
+SQLITE_PROJECT_QUERY = f"""
+SELECT projects.id AS id, projects.id AS project_id, projects.name AS title,
+       highlight(projects_fts, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_STOP}') AS highlight,
+       snippet(projects_fts, 1, '{HIGHLIGHT_START}', '{HIGHLIGHT_STOP}', '…', 20) AS snippet,
+       -bm25(projects_fts) AS rank
+FROM projects_fts JOIN projects ON projects.id = projects_fts.rowid
+WHERE projects_fts MATCH :term
+ORDER BY rank DESC, projects.id
+LIMIT :limit OFFSET :skip
+"""
+
+def _sqlite_match_expression(query: str):
+    # Quote every token so user input can't inject FTS5 syntax; trailing * gives prefix matching
+    tokens = [token.replace('"', '""') for token in query.split()]
+    return " ".join(f'"{token}"*' for token in tokens if token)
+
+def _run(db: Session, sql: str, term: str, kind: str, skip: int, limit: int):
+    rows = db.execute(text(sql), {"term": term, "skip": skip, "limit": limit}).mappings()
+    return [
+        {
+            "kind": kind,
+            "id": row["id"],
+            "project_id": row["project_id"],
+            "title": row["title"],
+            "highlight": row["highlight"],
+            "snippet": row["snippet"] or None,
+            "rank": float(row["rank"] or 0),
+        }
+        for row in rows
+    ]
+
+def search(db: Session, query: str, kinds=SEARCH_KINDS, skip: int = 0, limit: int = 20):
+    query = query.strip()
+    if not query:
+        return []
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        term = query
+        queries = {"task": POSTGRES_TASK_QUERY, "project": POSTGRES_PROJECT_QUERY}
+    elif dialect == "sqlite":
+        term = _sqlite_match_expression(query)
+        queries = {"task": SQLITE_TASK_QUERY, "project": SQLITE_PROJECT_QUERY}
+    else:
+        raise NotImplementedError(f"Search is not supported on the '{dialect}' database backend")
+
+    kinds = [kind for kind in SEARCH_KINDS if kind in kinds]
+    if len(kinds) == 1:
+        return _run(db, queries[kinds[0]], term, kinds[0], skip, limit)
+    # Each kind is ranked by its own index; fetch enough of both to cover the requested page, then merge
+    merged = []
+    for kind in kinds:
+        merged.extend(_run(db, queries[kind], term, kind, 0, skip + limit))
+    merged.sort(key=lambda hit: hit["rank"], reverse=True)
+    return merged[skip:skip + limit]
@@ -0,0 +1,162 @@
+# project_tracker_backend/serializers.py
+# Fast serialization path for large list endpoints.
+# Rows loaded from our own database are already valid, so instead of running every row
+# (and every nested project/user) through the orm_mode Pydantic models we copy the
+# attributes straight into dicts and encode them with orjson. The dict shapes mirror
+# schemas.UserInDB / ProjectInDB / TaskInDB; keep the field tuples below in sync.
+import json
+from datetime import date, datetime
+
+from fastapi import Header
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError: # optional dependency; falls back to the stdlib encoder
+    orjson = None
+
+USER_FIELDS = ("id", "username", "email", "created_at")
+PROJECT_FIELDS = (
+    "id", "name", "description", "created_by", "created_at",
+    "task_count", "todo_count", "in_progress_count", "done_count", "blocked_count",
+)
+TASK_FIELDS = (
+    "id", "title", "description", "status", "due_date", "project_id",
+    "assigned_to", "created_by", "created_at", "completed_at",
+)
+
+# Clients opt into the compact layout with this Accept media type (see columnar_payload)
+COLUMNAR_MEDIA_TYPE = "application/vnd.tracker.columnar+json"
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content) -> bytes:
+    # orjson handles date/datetime natively and is several times faster than json.dumps
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def loads(data: bytes):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+class Serializer:
+    # Memoizes nested users/projects so a user referenced by 1,000 tasks is built once per response.
+    # With a loaders.BatchLoader, related users/projects are resolved by id from its batched
+    # lookups instead of through the ORM relationships.
+    def __init__(self, loader=None):
+        self.loader = loader
+        self._users = {}
+        self._projects = {}
+
+    def user(self, db_user):
+        if db_user is None:
+            return None
+        data = self._users.get(db_user.id)
+        if data is None:
+            data = {field: getattr(db_user, field) for field in USER_FIELDS}
+            self._users[db_user.id] = data
+        return data
+
+    def project(self, db_project):
+        data = self._projects.get(db_project.id)
+        if data is None:
+            data = {field: getattr(db_project, field) for field in PROJECT_FIELDS}
+            if self.loader is not None:
+                data["creator"] = self.loader.user(db_project.created_by)
+            else:
+                data["creator"] = self.user(db_project.creator)
+            self._projects[db_project.id] = data
+        return data
+
+    def task(self, db_task):
+        data = {field: getattr(db_task, field) for field in TASK_FIELDS}
+        data["archived_at"] = getattr(db_task, "archived_at", None) # only archived rows have it
+        if self.loader is not None:
+            data["project"] = self.loader.project(db_task.project_id)
+            data["assignee"] = self.loader.user(db_task.assigned_to)
+            data["creator"] = self.loader.user(db_task.created_by)
+        else:
+            data["project"] = self.project(db_task.project)
+            data["assignee"] = self.user(db_task.assignee)
+            data["creator"] = self.user(db_task.creator)
+        return data
+
+def response_layout(accept: str = Header("")):
+    # Dependency for list endpoints: "columnar" when the client asked for it, else plain JSON
+    return "columnar" if COLUMNAR_MEDIA_TYPE in accept else "json"
+
+def columnar_payload(kind: str, db_rows, loader=None):
+    # Compact layout for bulk payloads: one array per field instead of one object per row,
+    # with every referenced project and user sent once in side tables. Clients rebuild the
+    # nested project/assignee/creator objects from project_id / assigned_to / created_by.
+    fields = {"user": USER_FIELDS, "project": PROJECT_FIELDS, "task": TASK_FIELDS + ("archived_at",)}[kind]
+    columns = {field: [] for field in fields}
+    serializer = Serializer(loader)
+    users = {}
+    projects = {}
+
+    def add_user(user):
+        if user is not None and user["id"] not in users:
+            users[user["id"]] = user
+
+    def add_project(project):
+        if project["id"] not in projects:
+            projects[project["id"]] = {key: value for key, value in project.items() if key != "creator"}
+            add_user(project["creator"])
+
+    for db_row in db_rows:
+        for field in fields:
+            columns[field].append(getattr(db_row, field, None))
+        if kind == "project":
+            add_user(serializer.project(db_row)["creator"])
+        elif kind == "task":
+            data = serializer.task(db_row)
+            add_project(data["project"])
+            add_user(data["assignee"])
+            add_user(data["creator"])
+
+    return {
+        "layout": "columnar",
+        "kind": kind,
+        "count": len(db_rows),
+        "columns": columns,
+        "projects": list(projects.values()),
+        "users": list(users.values()),
+    }
+
+def list_payload(kind: str, db_rows, layout: str = "json", loader=None):
+    # The response body as plain data, before encoding (this is what cache.py stores)
+    if loader is not None:
+        loader.prefetch(kind, db_rows)
+    if layout == "columnar":
+        return columnar_payload(kind, db_rows, loader)
+    serializer = Serializer(loader)
+    build = {"user": serializer.user, "project": serializer.project, "task": serializer.task}[kind]
+    return [build(db_row) for db_row in db_rows]
+
+def item_payload(kind: str, db_row, loader=None):
+    return list_payload(kind, [db_row], loader=loader)[0]
+
+def payload_response(payload, layout: str = "json"):
+    if layout == "columnar":
+        response = FastJSONResponse(payload, media_type=COLUMNAR_MEDIA_TYPE)
+    else:
+        response = FastJSONResponse(payload)
+    response.headers["Vary"] = "Accept"
+    return response
+
+def users_response(db_users, layout: str = "json", loader=None):
+    return payload_response(list_payload("user", db_users, layout, loader), layout)
+
+def projects_response(db_projects, layout: str = "json", loader=None):
+    return payload_response(list_payload("project", db_projects, layout, loader), layout)
+
+def tasks_response(db_tasks, layout: str = "json", loader=None):
+    return payload_response(list_payload("task", db_tasks, layout, loader), layout)
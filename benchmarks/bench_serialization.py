@@ -0,0 +1,68 @@
+# benchmarks/bench_serialization.py
+# Microbenchmark: current list-endpoint path (orm_mode Pydantic validation + stdlib json via
+# FastAPI's jsonable_encoder) vs the serializers fast path (plain dicts + orjson).
+# Run from the repository root:  python -m benchmarks.bench_serialization [--tasks 1000]
+import argparse
+import json
+import timeit
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from backend import schemas, serializers
+
+def make_rows(task_count, user_count=20, project_count=10):
+    # Plain attribute objects stand in for ORM rows so no database is needed
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    users = [
+        SimpleNamespace(id=i, username=f"user{i}", email=f"user{i}@example.com", created_at=now)
+        for i in range(1, user_count + 1)
+    ]
+    projects = [
+        SimpleNamespace(id=i, name=f"Project {i}", description="A project", created_by=users[i % user_count].id,
+                        created_at=now, creator=users[i % user_count], task_count=task_count // project_count,
+                        todo_count=0, in_progress_count=0, done_count=0, blocked_count=0)
+        for i in range(1, project_count + 1)
+    ]
+    tasks = []
+    for i in range(1, task_count + 1):
+        project = projects[i % project_count]
+        assignee = users[i % user_count] if i % 3 else None
+        creator = users[(i + 1) % user_count]
+        tasks.append(SimpleNamespace(
+            id=i, title=f"Task {i}", description="Some longer description of the work to be done",
+            status="To Do", due_date=date(2024, 2, 1), project_id=project.id,
+            assigned_to=assignee.id if assignee else None, created_by=creator.id, created_at=now,
+            completed_at=None, project=project, assignee=assignee, creator=creator,
+        ))
+    return tasks
+
+def current_path(tasks):
+    # What FastAPI does for response_model=List[TaskInDB]: validate every row, then encode
+    validated = [schemas.TaskInDB.from_orm(task) for task in tasks]
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+def fast_path(tasks):
+    return serializers.tasks_response(tasks).body
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    tasks = make_rows(args.tasks)
+    # Both paths must produce the same document
+    assert json.loads(current_path(tasks)) == json.loads(fast_path(tasks))
+
+    results = {}
+    for name, func in (("current", current_path), ("fast", fast_path)):
+        timings = timeit.repeat(lambda: func(tasks), repeat=args.repeat, number=args.number)
+        results[name] = min(timings) / args.number
+        print(f"{name:>8}: {results[name] * 1000:8.2f} ms per {args.tasks}-task response")
+    print(f" speedup: {results['current'] / results['fast']:8.1f}x (orjson {'on' if serializers.orjson else 'off'})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/bench_startup.py
+# Startup benchmark: time-to-first-request for fresh uvicorn workers, plus the bare
+# `import backend.main` cost. Each run is a new process, like a worker boot on Render.
+# Run from the repository root (DATABASE_URL should point at a migrated database):
+#   python -m benchmarks.bench_startup [--runs 5] [--port 8765]
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+def time_import():
+    # Fresh interpreter each time so nothing is cached in sys.modules
+    code = "import time; t = time.perf_counter(); import backend.main; print(time.perf_counter() - t)"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return float(output.stdout.strip())
+
+def time_first_request(port, timeout=30.0):
+    start = time.perf_counter()
+    worker = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise RuntimeError(f"Worker did not answer within {timeout}s")
+    finally:
+        worker.terminate()
+        worker.wait()
+
+def report(name, samples):
+    print(f"{name:>18}: median {statistics.median(samples) * 1000:8.1f} ms, "
+          f"min {min(samples) * 1000:8.1f} ms, max {max(samples) * 1000:8.1f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure worker startup time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    report("import backend.main", [time_import() for _ in range(args.runs)])
+    report("first request", [time_first_request(args.port) for _ in range(args.runs)])
+
+if __name__ == "__main__":
+    main()
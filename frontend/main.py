@@ -3,6 +3,7 @@ import streamlit as st
 import requests
 import json
 import os
+import time
 from datetime import datetime # Import datetime for date handling
 
 # --- Configuration ---
@@ -48,13 +49,79 @@ def login_user(username, password):
         st.error("Could not connect to the backend API. Please ensure the backend is running.")
         return None
 
+# Access tokens are short-lived; renew them this many seconds before they expire
+TOKEN_REFRESH_MARGIN_SECONDS = 60
+
+def store_tokens(token_data):
+    st.session_state["access_token"] = token_data["access_token"]
+    st.session_state["refresh_token"] = token_data.get("refresh_token")
+    expires_in = token_data.get("expires_in")
+    st.session_state["access_token_expires_at"] = time.time() + expires_in if expires_in else None
+
+def clear_tokens():
+    st.session_state["access_token"] = None
+    st.session_state["refresh_token"] = None
+    st.session_state["access_token_expires_at"] = None
+
+def refresh_access_token():
+    # Swap the refresh token for a new pair; on failure the user has to log in again
+    refresh_token = st.session_state.get("refresh_token")
+    if not refresh_token:
+        return False
+    try:
+        response = requests.post(f"{FASTAPI_BACKEND_URL}/token/refresh", json={"refresh_token": refresh_token})
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        return False
+    store_tokens(response.json())
+    return True
+
 def get_headers():
-    # Get token from session state if available
+    # Get token from session state if available, renewing it first when it is about to expire
+    expires_at = st.session_state.get("access_token_expires_at")
+    if expires_at and time.time() > expires_at - TOKEN_REFRESH_MARGIN_SECONDS:
+        if not refresh_access_token():
+            clear_tokens()
     token = st.session_state.get("access_token")
     if token:
         return {"Authorization": f"Bearer {token}"}
     return {}
 
+# List endpoints answer in a compact columnar layout when asked for it; together with the
+# gzip/brotli compression negotiated by requests (brotli when the package is installed)
+# this shrinks large boards by roughly an order of magnitude on the wire.
+COLUMNAR_MEDIA_TYPE = "application/vnd.tracker.columnar+json"
+
+def get_list_headers():
+    headers = get_headers()
+    if headers:
+        headers["Accept"] = f"{COLUMNAR_MEDIA_TYPE}, application/json;q=0.9"
+    return headers
+
+def decode_columnar(payload):
+    # Rebuilds the regular list-of-objects shape, including nested project/assignee/creator
+    users = {user["id"]: user for user in payload.get("users", [])}
+    projects = {}
+    for project in payload.get("projects", []):
+        project["creator"] = users.get(project["created_by"])
+        projects[project["id"]] = project
+
+    columns = payload["columns"]
+    rows = [dict(zip(columns.keys(), values)) for values in zip(*columns.values())]
+    for row in rows:
+        if payload["kind"] == "project":
+            row["creator"] = users.get(row["created_by"])
+        elif payload["kind"] == "task":
+            row["project"] = projects.get(row["project_id"])
+            row["assignee"] = users.get(row["assigned_to"])
+            row["creator"] = users.get(row["created_by"])
+    return rows
+
+def decode_list_response(response):
+    if response.headers.get("Content-Type", "").startswith(COLUMNAR_MEDIA_TYPE):
+        return decode_columnar(response.json())
+    return response.json()
+
 def get_current_user_info():
     headers = get_headers()
     if not headers:
@@ -66,7 +133,7 @@ def get_current_user_info():
     except requests.exceptions.HTTPError as e:
         if e.response.status_code == 401:
             st.session_state["logged_in"] = False
-            st.session_state["access_token"] = None
+            clear_tokens()
             st.error("Session expired. Please log in again.")
             st.experimental_rerun()
         else:
@@ -77,13 +144,13 @@ def get_current_user_info():
         return None
 
 def get_users(): # New function to get all users for task assignment dropdown
-    headers = get_headers()
+    headers = get_list_headers()
     if not headers:
         return []
     try:
         response = requests.get(f"{FASTAPI_BACKEND_URL}/users/", headers=headers)
         response.raise_for_status()
-        return response.json()
+        return decode_list_response(response)
     except requests.exceptions.HTTPError as e:
         st.error(f"Failed to fetch users: {e.response.json().get('detail', 'Unknown error')}")
         return []
@@ -93,13 +160,13 @@ def get_users(): # New function to get all users for task assignment dropdown
 
 
 def get_projects():
-    headers = get_headers()
+    headers = get_list_headers()
     if not headers:
         return []
     try:
         response = requests.get(f"{FASTAPI_BACKEND_URL}/projects/", headers=headers)
         response.raise_for_status()
-        return response.json()
+        return decode_list_response(response)
     except requests.exceptions.HTTPError as e:
         st.error(f"Failed to fetch projects: {e.response.json().get('detail', 'Unknown error')}")
         return []
@@ -127,7 +194,7 @@ def create_project(name, description):
         return None
 
 def get_tasks(project_id=None):
-    headers = get_headers()
+    headers = get_list_headers()
     if not headers:
         return []
     try:
@@ -136,7 +203,7 @@ def get_tasks(project_id=None):
         else:
             response = requests.get(f"{FASTAPI_BACKEND_URL}/tasks/", headers=headers)
         response.raise_for_status()
-        return response.json()
+        return decode_list_response(response)
     except requests.exceptions.HTTPError as e:
         st.error(f"Failed to fetch tasks: {e.response.json().get('detail', 'Unknown error')}")
         return []
@@ -144,6 +211,49 @@ def get_tasks(project_id=None):
         st.error("Could not connect to the backend API. Please ensure the backend is running.")
         return []
 
+def get_my_tasks(status=None, due=None):
+    # Tasks assigned to the logged-in user, filtered server-side
+    headers = get_list_headers()
+    if not headers:
+        return []
+    params = {}
+    if status:
+        params["status"] = status
+    if due:
+        params["due"] = due
+    try:
+        response = requests.get(f"{FASTAPI_BACKEND_URL}/users/me/tasks", params=params, headers=headers)
+        response.raise_for_status()
+        return decode_list_response(response)
+    except requests.exceptions.HTTPError as e:
+        st.error(f"Failed to fetch your tasks: {e.response.json().get('detail', 'Unknown error')}")
+        return []
+    except requests.exceptions.ConnectionError:
+        st.error("Could not connect to the backend API. Please ensure the backend is running.")
+        return []
+
+def get_notifications(unread_only=True):
+    # Due-date reminders for the logged-in user (see backend/reminders.py)
+    headers = get_headers()
+    if not headers:
+        return []
+    try:
+        response = requests.get(f"{FASTAPI_BACKEND_URL}/users/me/notifications",
+                                params={"unread_only": unread_only}, headers=headers)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException:
+        return [] # reminders are optional; never block the page on them
+
+def mark_notification_read(notification_id):
+    headers = get_headers()
+    try:
+        response = requests.post(f"{FASTAPI_BACKEND_URL}/notifications/{notification_id}/read", headers=headers)
+        response.raise_for_status()
+        return True
+    except requests.exceptions.RequestException:
+        return False
+
 def create_task(title, description, status, due_date, project_id, assigned_to):
     headers = get_headers()
     if not headers:
@@ -195,6 +305,22 @@ def update_task(task_id, updates):
         st.error("Could not connect to the backend API. Please ensure the backend is running.")
         return None
 
+def batch_update_tasks(items):
+    # items: [{"id": ..., "changes": {...}, "base": {...}}] -> {"updated": [...], "conflicts": [...], "missing": [...]}
+    headers = get_headers()
+    if not headers:
+        return None
+    try:
+        response = requests.post(f"{FASTAPI_BACKEND_URL}/tasks/batch", json={"items": items}, headers=headers)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.HTTPError as e:
+        st.error(f"Failed to save changes: {e.response.json().get('detail', 'Unknown error')}")
+        return None
+    except requests.exceptions.ConnectionError:
+        st.error("Could not connect to the backend API. Please ensure the backend is running.")
+        return None
+
 def delete_task(task_id):
     headers = get_headers()
     if not headers:
@@ -210,6 +336,80 @@ def delete_task(task_id):
         st.error("Could not connect to the backend API. Please ensure the backend is running.")
         return False
 
+# --- Local Board State ---
+# The Kanban board works on a local copy of the tasks. Status moves are applied to it
+# immediately and queued in "pending_task_updates" ({task_id: {"changes", "base"}}), then
+# flushed together through /tasks/batch instead of one write plus a full reload per move.
+KANBAN_FLUSH_THRESHOLD = 10 # Flush automatically once this many tasks have pending changes
+
+def get_board_tasks():
+    if st.session_state.get("board_tasks") is None:
+        st.session_state["board_tasks"] = get_tasks()
+    return st.session_state["board_tasks"]
+
+def upsert_board_task(task):
+    # Keeps the local copy in step with writes made outside the queue (create/edit forms)
+    board_tasks = st.session_state.get("board_tasks")
+    if board_tasks is None:
+        return
+    for i, board_task in enumerate(board_tasks):
+        if board_task['id'] == task['id']:
+            board_tasks[i] = task
+            return
+    board_tasks.append(task)
+
+def remove_board_task(task_id):
+    board_tasks = st.session_state.get("board_tasks")
+    if board_tasks is not None:
+        st.session_state["board_tasks"] = [task for task in board_tasks if task['id'] != task_id]
+    st.session_state.get("pending_task_updates", {}).pop(task_id, None)
+
+def queue_task_change(task_id, field, value):
+    board_task = next((task for task in get_board_tasks() if task['id'] == task_id), None)
+    if board_task is None:
+        return
+    pending = st.session_state.setdefault("pending_task_updates", {})
+    entry = pending.setdefault(task_id, {"changes": {}, "base": {}})
+    # base keeps the last value confirmed by the server, even across several local moves
+    entry["base"].setdefault(field, board_task[field])
+    entry["changes"][field] = value
+    board_task[field] = value # optimistic local update
+    if entry["changes"] == entry["base"]:
+        del pending[task_id] # moved back to where it started: nothing to send
+
+def queue_status_change(task_id, widget_key):
+    # on_change callback: runs before the rerun renders, so the card lands in its new column
+    queue_task_change(task_id, "status", st.session_state[widget_key])
+
+def flush_pending_updates():
+    pending = st.session_state.get("pending_task_updates", {})
+    if not pending:
+        return
+    items = [{"id": task_id, **entry} for task_id, entry in pending.items()]
+    result = batch_update_tasks(items)
+    if result is None:
+        return # keep the queue; the user can retry
+    for task in result["updated"]:
+        upsert_board_task(task)
+    for conflict in result["conflicts"]:
+        # Someone else changed the task: take the server's version and drop our stale widget state
+        upsert_board_task(conflict["current"])
+        st.session_state.pop(f"status_select_{conflict['id']}", None)
+        changed = ", ".join(conflict["fields"])
+        st.warning(f"Task '{conflict['current']['title']}' was changed by someone else ({changed}); your change was not saved.")
+    for task_id in result["missing"]:
+        remove_board_task(task_id)
+        st.warning(f"Task {task_id} no longer exists.")
+    st.session_state["pending_task_updates"] = {}
+    if result["updated"]:
+        st.success(f"Saved {len(result['updated'])} change(s).")
+
+def discard_pending_updates():
+    for task_id in st.session_state.get("pending_task_updates", {}):
+        st.session_state.pop(f"status_select_{task_id}", None)
+    st.session_state["pending_task_updates"] = {}
+    st.session_state["board_tasks"] = None # refetch the server's state
+
 # --- Streamlit UI Components ---
 
 def show_registration_page():
@@ -239,7 +439,7 @@ def show_login_page():
             if username and password:
                 token_data = login_user(username, password)
                 if token_data:
-                    st.session_state["access_token"] = token_data["access_token"]
+                    store_tokens(token_data)
                     st.session_state["logged_in"] = True
                     st.success("Logged in successfully!")
                     st.experimental_rerun() # Rerun to switch to main app
@@ -248,13 +448,13 @@ def show_login_page():
 
 def logout():
     st.session_state["logged_in"] = False
-    st.session_state["access_token"] = None
+    clear_tokens()
     st.success("You have been logged out.")
     st.experimental_rerun() # Rerun to show login/register
 
 def show_main_app():
     st.sidebar.title("Navigation")
-    app_mode = st.sidebar.radio("Go to", ["Projects Overview", "All Tasks (Kanban)"])
+    app_mode = st.sidebar.radio("Go to", ["Projects Overview", "My Tasks", "All Tasks (Kanban)"])
 
     st.sidebar.markdown("---")
     st.sidebar.button("Logout", on_click=logout)
@@ -262,15 +462,30 @@ def show_main_app():
     current_user = get_current_user_info()
     if current_user:
         st.sidebar.write(f"Logged in as: **{current_user['username']}**")
+        show_notifications()
     else:
         st.sidebar.warning("Could not fetch user info.")
         logout() # Force logout if user info can't be fetched
 
     if app_mode == "Projects Overview":
         show_projects_overview()
+    elif app_mode == "My Tasks":
+        show_my_tasks()
     elif app_mode == "All Tasks (Kanban)":
         show_all_tasks_kanban()
 
+def show_notifications():
+    notifications = get_notifications()
+    if not notifications:
+        return
+    with st.sidebar.expander(f"Reminders ({len(notifications)})", expanded=True):
+        for notification in notifications:
+            icon = "⚠️" if notification['kind'] == "overdue" else "⏰"
+            st.write(f"{icon} {notification['message']}")
+            if st.button("Dismiss", key=f"dismiss_notification_{notification['id']}"):
+                mark_notification_read(notification['id'])
+                st.experimental_rerun()
+
 def show_projects_overview():
     st.title("Project Management Dashboard")
     st.subheader("Your Projects")
@@ -285,17 +500,21 @@ def show_projects_overview():
 
     for project in projects:
         with cols[col_idx % 2]:
-            with st.expander(f"**{project['name']}** (ID: {project['id']})"):
+            # Progress comes from the project's denormalized counters, no task fetch needed
+            progress = f"{project.get('done_count', 0)}/{project.get('task_count', 0)} done"
+            with st.expander(f"**{project['name']}** (ID: {project['id']}) — {progress}"):
                 st.write(f"**Description:** {project['description']}")
                 st.write(f"**Created By:** {project['creator']['username']}")
                 st.write(f"**Created On:** {project['created_at'].split('T')[0]}") # Show date only
+                st.write(
+                    f"**To Do:** {project.get('todo_count', 0)} | **In Progress:** {project.get('in_progress_count', 0)} | "
+                    f"**Done:** {project.get('done_count', 0)} | **Blocked:** {project.get('blocked_count', 0)}"
+                )
 
                 # Tasks for this project
                 st.subheader(f"Tasks for {project['name']}")
-                # Fetch all tasks and filter them by project_id here in frontend for simplicity
-                # For very large number of tasks, it's better to fetch by project_id from backend if possible
-                all_tasks_for_filter = get_tasks() # Fetch all tasks to filter
-                project_tasks = [task for task in all_tasks_for_filter if task['project_id'] == project['id']]
+                # Only hit the backend when the project actually has tasks
+                project_tasks = get_tasks(project['id']) if project.get('task_count', 1) else []
                 
                 if project_tasks:
                     for task in project_tasks:
@@ -377,11 +596,33 @@ def show_projects_overview():
                     task_due_date, task_project_id, task_assigned_to_id
                 )
                 if new_task:
+                    upsert_board_task(new_task)
                     st.success(f"Task '{new_task['title']}' created successfully!")
                     st.experimental_rerun()
             else:
                 st.warning("Task title and Project assignment are required.")
 
+def show_my_tasks():
+    st.title("My Tasks")
+
+    due_labels = {"All": None, "Overdue": "overdue", "Due Today": "today", "Due This Week": "week"}
+    col_due, col_status = st.columns(2)
+    with col_due:
+        selected_due = st.radio("Due", list(due_labels.keys()), horizontal=True, key="my_tasks_due")
+    with col_status:
+        selected_statuses = st.multiselect("Status", ["To Do", "In Progress", "Done", "Blocked"], key="my_tasks_status")
+
+    my_tasks = get_my_tasks(status=selected_statuses, due=due_labels[selected_due])
+    if not my_tasks:
+        st.info("No tasks assigned to you match these filters.")
+
+    for task in my_tasks:
+        status_color = "green" if task['status'] == "Done" else ("orange" if task['status'] == "In Progress" else "red")
+        st.markdown(f"**[{task['status']}]** <span style='color:{status_color}'>{task['title']}</span>", unsafe_allow_html=True)
+        st.caption(f"Project: {task['project']['name']}")
+        st.write(f"Due: {task['due_date']}" if task['due_date'] else "No due date")
+        st.markdown("---")
+
 def edit_task_form(task_data, all_users_data):
     # Fetch all users for assignment dropdown (passed as all_users_data)
     user_options = {user['username']: user['id'] for user in all_users_data}
@@ -423,17 +664,109 @@ def edit_task_form(task_data, all_users_data):
             if updates:
                 updated_task = update_task(task_data['id'], updates)
                 if updated_task:
+                    upsert_board_task(updated_task)
                     st.success(f"Task '{updated_task['title']}' updated successfully!")
                     st.experimental_rerun()
             else:
                 st.info("No changes to update.")
 
 
+KANBAN_STATUS_ORDER = ["To Do", "In Progress", "Done", "Blocked"]
+KANBAN_PAGE_SIZE = 10 # Cards rendered per column before "Load more"
+
+def get_kanban_card(task, user_map, project_map):
+    # Display data for one card, cached across reruns until the task (or a name it shows) changes
+    cache = st.session_state.setdefault("kanban_card_cache", {})
+    assignee_name = user_map.get(task['assigned_to'], "Unassigned")
+    project_name = project_map.get(task['project_id'], "Unknown Project")
+    fingerprint = (task['title'], task['description'], task['status'], task['due_date'], assignee_name, project_name)
+    cached = cache.get(task['id'])
+    if cached and cached["fingerprint"] == fingerprint:
+        return cached
+    card = {
+        "fingerprint": fingerprint,
+        "title": f"**{task['title']}**",
+        "project": f"Project: {project_name}",
+        "body": "\n\n".join(filter(None, [
+            task['description'] if task['description'] else "No description",
+            f"Assigned to: {assignee_name}",
+            f"Due: {task['due_date']}" if task['due_date'] else "",
+        ])),
+        "status_index": KANBAN_STATUS_ORDER.index(task['status']) if task['status'] in KANBAN_STATUS_ORDER else 0,
+    }
+    cache[task['id']] = card
+    return card
+
+def show_kanban_card(task, card, all_users):
+    with st.container(border=True): # New in Streamlit 1.25.0 for bordered containers
+        st.markdown(card["title"])
+        st.caption(card["project"])
+        st.markdown(card["body"])
+
+        if task['id'] in st.session_state.get("pending_task_updates", {}):
+            st.caption("Unsaved change")
+        status_key = f"status_select_{task['id']}" # Unique key for each selectbox
+        st.selectbox(
+            "Change Status",
+            KANBAN_STATUS_ORDER,
+            index=card["status_index"],
+            key=status_key,
+            on_change=queue_status_change,
+            args=(task['id'], status_key),
+        )
+
+        # Only one card at a time has its edit form (and its widgets) built
+        editing = st.session_state.get("kanban_editing_task_id") == task['id']
+        col_edit, col_delete = st.columns(2)
+        with col_edit:
+            if st.button("Close" if editing else "Edit", key=f"edit_task_btn_{task['id']}"):
+                st.session_state["kanban_editing_task_id"] = None if editing else task['id']
+                st.experimental_rerun()
+        with col_delete:
+            if st.button("Delete", key=f"delete_task_btn_{task['id']}"):
+                st.session_state["kanban_confirm_delete_id"] = task['id']
+                st.experimental_rerun()
+
+        if editing:
+            edit_task_form(task, all_users)
+
+        if st.session_state.get("kanban_confirm_delete_id") == task['id']:
+            st.warning("Are you sure you want to delete this task? This action cannot be undone.")
+            col_confirm, col_cancel = st.columns(2)
+            with col_confirm:
+                if st.button("Confirm Delete", key=f"confirm_delete_btn_{task['id']}"):
+                    st.session_state["kanban_confirm_delete_id"] = None
+                    if delete_task(task['id']):
+                        remove_board_task(task['id'])
+                        st.success("Task deleted.")
+                        st.experimental_rerun()
+                    else:
+                        st.error("Failed to delete task.")
+            with col_cancel:
+                if st.button("Cancel", key=f"cancel_delete_btn_{task['id']}"):
+                    st.session_state["kanban_confirm_delete_id"] = None
+                    st.experimental_rerun()
+
 def show_all_tasks_kanban():
     st.title("All Tasks (Kanban Board)")
     st.markdown("This Kanban-like display allows you to visualize and update task statuses. Drag and drop is not directly supported in Streamlit, but you can update statuses using the dropdowns.")
 
-    all_tasks = get_tasks()
+    # Pending status moves are sent in one batch: on demand, or once enough have queued up
+    pending = st.session_state.get("pending_task_updates", {})
+    if len(pending) >= KANBAN_FLUSH_THRESHOLD:
+        flush_pending_updates()
+        pending = st.session_state.get("pending_task_updates", {})
+    col_save, col_discard, col_refresh = st.columns(3)
+    with col_save:
+        st.button(f"Save changes ({len(pending)})", on_click=flush_pending_updates, disabled=not pending)
+    with col_discard:
+        st.button("Discard changes", on_click=discard_pending_updates, disabled=not pending)
+    with col_refresh:
+        # Reloads from the server; disabled while there are unsaved moves
+        if st.button("Refresh", disabled=bool(pending)):
+            st.session_state["board_tasks"] = None
+
+    all_tasks = get_board_tasks() # Local copy with optimistic updates applied
     all_users = get_users() # Fetch all users once for assignment dropdowns
     all_projects = get_projects() # Fetch all projects once
 
@@ -441,98 +774,50 @@ def show_all_tasks_kanban():
     user_map = {user['id']: user['username'] for user in all_users}
     project_map = {project['id']: project['name'] for project in all_projects}
 
-    # Define the order of Kanban columns
-    status_order = ["To Do", "In Progress", "Done", "Blocked"] 
-
     # Group tasks by status
-    tasks_by_status = {status: [] for status in status_order}
+    tasks_by_status = {status: [] for status in KANBAN_STATUS_ORDER}
     for task in all_tasks:
         if task['status'] in tasks_by_status:
             tasks_by_status[task['status']].append(task)
         else:
             # Handle unexpected statuses by putting them in 'To Do' or similar
-            tasks_by_status["To Do"].append(task) 
+            tasks_by_status["To Do"].append(task)
 
-    # Display columns using Streamlit's columns layout
-    cols = st.columns(len(status_order)) 
+    # Display columns using Streamlit's columns layout. Each column renders at most
+    # kanban_visible_<status> cards, so rerun cost follows what is on screen, not the task count.
+    cols = st.columns(len(KANBAN_STATUS_ORDER))
+
+    for i, status in enumerate(KANBAN_STATUS_ORDER):
+        column_tasks = tasks_by_status[status]
+        visible_key = f"kanban_visible_{status}"
+        st.session_state.setdefault(visible_key, KANBAN_PAGE_SIZE)
 
-    for i, status in enumerate(status_order):
         with cols[i]:
-            st.subheader(f"{status} ({len(tasks_by_status[status])})")
+            st.subheader(f"{status} ({len(column_tasks)})")
+            collapsed = st.checkbox("Collapse", key=f"kanban_collapsed_{status}")
             st.markdown("---") # Visual separator for columns
+            if collapsed:
+                continue
 
-            if not tasks_by_status[status]:
+            if not column_tasks:
                 st.info("No tasks here.")
-            
-            for task in tasks_by_status[status]:
-                card_title = f"{task['title']}"
-                card_description = task['description'] if task['description'] else "No description"
-                assignee_name = user_map.get(task['assigned_to'], "Unassigned")
-                project_name = project_map.get(task['project_id'], "Unknown Project")
-                due_date_display = f"Due: {task['due_date']}" if task['due_date'] else ""
-
-                # Task Card (using Streamlit components for visual grouping)
-                with st.container(border=True): # New in Streamlit 1.25.0 for bordered containers
-                    st.markdown(f"**{card_title}**")
-                    st.caption(f"Project: {project_name}")
-                    st.write(card_description)
-                    st.write(f"Assigned to: {assignee_name}")
-                    if due_date_display:
-                        st.write(due_date_display)
-
-                    # Status update dropdown
-                    # Ensure index is within bounds
-                    try:
-                        current_status_index = status_order.index(task['status'])
-                    except ValueError:
-                        current_status_index = 0 # Default to 'To Do' if status is unrecognized
-
-                    new_status = st.selectbox(
-                        "Change Status",
-                        status_order,
-                        index=current_status_index,
-                        key=f"status_select_{task['id']}" # Unique key for each selectbox
-                    )
-                    if new_status != task['status']:
-                        if update_task(task['id'], {"status": new_status}):
-                            st.success(f"Task '{task['title']}' moved to '{new_status}'")
-                            st.experimental_rerun() # Rerun to update Kanban view
-
-                    # Use session state to control expander visibility for edit form
-                    if f"show_edit_form_{task['id']}" not in st.session_state:
-                        st.session_state[f"show_edit_form_{task['id']}"] = False
-
-                    if st.button(f"Edit Details {task['id']}", key=f"edit_task_btn_{task['id']}"):
-                        st.session_state[f"show_edit_form_{task['id']}"] = not st.session_state[f"show_edit_form_{task['id']}"]
-                        st.experimental_rerun() # Rerun to show/hide the expander
-
-                    if st.session_state[f"show_edit_form_{task['id']}"]:
-                        with st.expander(f"Editing {task['title']}", expanded=True):
-                            edit_task_form(task, all_users) # Pass all users data
-                            # Add a button to explicitly close the form
-                            if st.button("Close Edit Form", key=f"close_edit_btn_{task['id']}"):
-                                st.session_state[f"show_edit_form_{task['id']}"] = False
-                                st.experimental_rerun() # Rerun to collapse the expander
-
-                    # Delete button with confirmation
-                    if st.button(f"Delete Task {task['id']}", key=f"delete_task_btn_{task['id']}"):
-                        # Simple confirmation for delete
-                        if st.warning("Are you sure you want to delete this task? This action cannot be undone."):
-                            if st.button(f"Confirm Delete Task {task['id']}", key=f"confirm_delete_btn_{task['id']}"):
-                                if delete_task(task['id']):
-                                    st.success("Task deleted.")
-                                    st.experimental_rerun()
-                                else:
-                                    st.error("Failed to delete task.")
-                                
-                st.markdown("<br>") # Spacer between cards
+
+            visible_tasks = column_tasks[:st.session_state[visible_key]]
+            for task in visible_tasks:
+                show_kanban_card(task, get_kanban_card(task, user_map, project_map), all_users)
+
+            hidden_count = len(column_tasks) - len(visible_tasks)
+            if hidden_count > 0:
+                if st.button(f"Load more ({hidden_count} hidden)", key=f"kanban_load_more_{status}"):
+                    st.session_state[visible_key] += KANBAN_PAGE_SIZE
+                    st.experimental_rerun()
 
 
 # --- Main App Logic ---
 if "logged_in" not in st.session_state:
     st.session_state["logged_in"] = False
 if "access_token" not in st.session_state:
-    st.session_state["access_token"] = None
+    clear_tokens()
 
 st.sidebar.title("Project Tracker")
 